@@ -8,36 +8,394 @@ import asyncio
 import logging
 import uuid
 import time
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Union
 from datetime import datetime, timedelta
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import r2_score
 from scipy import stats
-from scipy.stats import pearsonr, spearmanr
 import psutil
 import json
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from itertools import islice
+
+from config import settings
+
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    ARROW_AVAILABLE = False
+
+try:
+    import bottleneck as bn
+    BOTTLENECK_AVAILABLE = True
+except ImportError:
+    bn = None
+    BOTTLENECK_AVAILABLE = False
+
+try:
+    import cupy as cp
+    CUPY_AVAILABLE = True
+except ImportError:
+    cp = None
+    CUPY_AVAILABLE = False
+
+# État GPU initialisé au premier calcul déporté (settings.use_gpu): aucun contexte CUDA à l'import
+_GPU_SEMAPHORE: Optional[threading.BoundedSemaphore] = None
+_GPU_INIT_FAILED = False
+_GPU_INIT_LOCK = threading.Lock()
 
 logger = logging.getLogger(__name__)
 
+# Fréquences de rééchantillonnage pour l'analyse des tendances
+TREND_PERIOD_FREQUENCIES = {
+    "daily": "D",
+    "weekly": "W",
+    "monthly": "MS"
+}
+
+# Seuils (bornes inférieures incluses) et libellés de force des corrélations
+_STRENGTH_BINS = np.array([0.2, 0.4, 0.6, 0.8])
+_STRENGTH_LABELS = np.array(["very_weak", "weak", "moderate", "strong", "very_strong"])
+
+def _to_dataframe(data: List[Dict]) -> pd.DataFrame:
+    """Construit un DataFrame à partir des enregistrements JSON via Arrow si disponible"""
+    if ARROW_AVAILABLE and data:
+        try:
+            # pa.array infère le schéma (union des clés) en C sur tous les enregistrements
+            table = pa.Table.from_struct_array(pa.array(data))
+            return table.to_pandas()
+        except (pa.ArrowException, TypeError, ValueError):
+            # Types hétérogènes dans une colonne: inférence pandas classique
+            pass
+    
+    return pd.DataFrame(data)
+
+def records_to_columns(records: List[Dict], variables: List[str]) -> Dict[str, Optional[np.ndarray]]:
+    """
+    Convertit les enregistrements en colonnes float64 pour les variables demandées.
+    
+    Une variable absente de tous les enregistrements est omise; une variable non
+    numérique (chaînes, booléens, valeurs toutes nulles) est associée à None.
+    """
+    columns = {}
+    for var in dict.fromkeys(variables):
+        if not any(var in record for record in records):
+            continue
+        
+        values = [record.get(var) for record in records]
+        if all(value is None for value in values) or any(isinstance(value, (str, bool)) for value in values):
+            columns[var] = None
+            continue
+        
+        try:
+            columns[var] = np.fromiter(
+                (np.nan if value is None else value for value in values),
+                dtype=np.float64,
+                count=len(values)
+            )
+        except (TypeError, ValueError):
+            columns[var] = None
+    
+    return columns
+
+def arrow_stream_to_dataframe(body: bytes) -> pd.DataFrame:
+    """Décode un flux Arrow IPC (application/vnd.apache.arrow.stream) en DataFrame colonnaire"""
+    if not ARROW_AVAILABLE:
+        raise RuntimeError("pyarrow n'est pas installé: format Arrow non supporté")
+    
+    table = pa.ipc.open_stream(body).read_all()
+    # split_blocks/self_destruct: pas de consolidation en blocs ni de double copie mémoire
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+def _centered_gram_matrix(X: np.ndarray, memory_limit: Optional[int] = None) -> np.ndarray:
+    """
+    Calcule Xc.T @ Xc (Xc = X centré) par blocs de lignes.
+    
+    Le bloc centré temporaire ne dépasse pas memory_limit octets: pour les grands n,
+    on n'alloue jamais la copie centrée complète de X.
+    """
+    n, k = X.shape
+    mean = X.mean(axis=0)
+    
+    block_rows = n
+    if memory_limit:
+        block_rows = max(1, min(n, memory_limit // max(1, k * X.itemsize)))
+    
+    gram = np.zeros((k, k))
+    for start in range(0, n, block_rows):
+        block = X[start:start + block_rows] - mean
+        gram += block.T @ block
+    
+    return gram
+
+def _init_gpu() -> threading.BoundedSemaphore:
+    """
+    Pool mémoire partagé (pas d'allocation device à chaque requête) et sémaphore d'un calcul
+    simultané par périphérique, créés une seule fois au premier calcul GPU.
+    
+    Un échec (aucun périphérique, pilote absent) désactive le GPU pour la suite du processus.
+    """
+    global _GPU_SEMAPHORE, _GPU_INIT_FAILED
+    with _GPU_INIT_LOCK:
+        if _GPU_SEMAPHORE is None:
+            try:
+                cp.cuda.set_allocator(cp.cuda.MemoryPool().malloc)
+                _GPU_SEMAPHORE = threading.BoundedSemaphore(cp.cuda.runtime.getDeviceCount())
+            except Exception:
+                _GPU_INIT_FAILED = True
+                raise
+        return _GPU_SEMAPHORE
+
+def _gpu_centered_gram_matrix(X: np.ndarray) -> np.ndarray:
+    """Calcule Xc.T @ Xc sur GPU (CuPy) et rapatrie la matrice k x k"""
+    with _init_gpu():
+        Xg = cp.asarray(X)
+        Xg -= Xg.mean(axis=0)
+        return cp.asnumpy(Xg.T @ Xg)
+
+def _use_gpu_for(X: np.ndarray) -> bool:
+    """Indique si le produit matriciel doit être déporté sur GPU"""
+    return (
+        settings.use_gpu and CUPY_AVAILABLE and not _GPU_INIT_FAILED
+        and X.nbytes > settings.gpu_offload_threshold
+    )
+
+def _fast_pearson_no_nan(X: np.ndarray, memory_limit: Optional[int] = None) -> np.ndarray:
+    """
+    Matrice de corrélation de Pearson des colonnes de X (sans valeurs manquantes).
+    
+    Normalisation en place de la covariance (c *= d; c *= d[:, None]) plutôt que
+    par le produit extérieur des écarts-types, ce qui évite une matrice k x k temporaire.
+    """
+    c = None
+    if _use_gpu_for(X):
+        try:
+            c = _gpu_centered_gram_matrix(X)
+        except Exception as e:
+            logger.warning(f"Échec du calcul GPU, repli sur CPU: {str(e)}")
+    if c is None:
+        c = _centered_gram_matrix(X, memory_limit)
+    defined = np.diag(c) > 0
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d = np.sqrt(1.0 / np.diag(c))
+        c *= d
+        c *= d[:, np.newaxis]
+    
+    return _finalize_correlation_matrix(c, defined)
+
+def _dataframe_corr(frame: pd.DataFrame, method: str = "pearson") -> pd.DataFrame:
+    """
+    DataFrame.corr, délégué à Modin (MapReduce sur partitions) pour les très grands volumes.
+    
+    Modin n'est importé qu'à la demande; en son absence on reste sur pandas.
+    """
+    if settings.distributed_corr_enabled and len(frame) >= settings.distributed_corr_min_rows:
+        try:
+            import modin.pandas as mpd
+            from modin.utils import to_pandas
+            return to_pandas(mpd.DataFrame(frame).corr(method=method))
+        except ImportError:
+            logger.warning("Modin indisponible, corrélation calculée avec pandas")
+    
+    return frame.corr(method=method)
+
+def _pearson_correlation_frame(df: pd.DataFrame, numeric_columns: List[str]) -> pd.DataFrame:
+    """
+    Matrice de Pearson des colonnes numériques via les noyaux GEMM (paires complètes si NaN).
+    
+    Équivalent à df[numeric_columns].corr(); les très grands volumes passent par _dataframe_corr.
+    """
+    if settings.distributed_corr_enabled and len(df) >= settings.distributed_corr_min_rows:
+        return _dataframe_corr(df[numeric_columns])
+    
+    X = df[numeric_columns].to_numpy(dtype=np.float64, na_value=np.nan)
+    observed = ~np.isnan(X)
+    if observed.all():
+        C = _fast_pearson_no_nan(X, settings.correlation_memory_limit)
+    else:
+        M = observed.astype(np.float64)
+        C = _pairwise_pearson_with_nan(X, observed, M.T @ M)
+    
+    return pd.DataFrame(C, index=numeric_columns, columns=numeric_columns)
+
+def _finalize_correlation_matrix(C: np.ndarray, defined: np.ndarray) -> np.ndarray:
+    """
+    Rend la matrice exactement symétrique (triangle supérieur recopié) et fixe la
+    diagonale à 1 sans la calculer (NaN pour les variables sans variance).
+    """
+    rows, cols = np.triu_indices(C.shape[0], k=1)
+    C[cols, rows] = C[rows, cols]
+    np.fill_diagonal(C, np.where(defined, 1.0, np.nan))
+    
+    # Les erreurs d'arrondi peuvent faire légèrement sortir r de [-1, 1]
+    np.clip(C, -1.0, 1.0, out=C)
+    return C
+
+def _pairwise_pearson_with_nan(
+    X: np.ndarray,
+    observed: np.ndarray,
+    pair_counts: np.ndarray
+) -> np.ndarray:
+    """
+    Matrice de corrélation de Pearson sur les observations complètes de chaque paire.
+    
+    Les sommes masquées (sommes, sommes des carrés, produits croisés) sont obtenues
+    par trois GEMM au lieu d'un dropna par paire de variables; pair_counts (M.T @ M)
+    est fourni par l'appelant qui le réutilise pour les p-values.
+    """
+    M = observed.astype(np.float64)
+    # Le décalage par la moyenne ne change pas r mais limite les erreurs d'annulation
+    X0 = np.where(observed, X - np.nanmean(X, axis=0), 0.0)
+    
+    sums = X0.T @ M                 # somme de x_i sur les lignes où i et j sont observés
+    sums_sq = (X0 * X0).T @ M       # somme de x_i² sur ces mêmes lignes
+    cross = X0.T @ X0               # somme de x_i * x_j
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_i = sums / pair_counts
+        mean_j = mean_i.T
+        cov = cross / pair_counts - mean_i * mean_j
+        var_i = sums_sq / pair_counts - mean_i * mean_i
+        var_j = var_i.T
+        C = cov / np.sqrt(var_i * var_j)
+    
+    # Moins de deux observations communes ou variance nulle: corrélation indéfinie
+    undefined = (pair_counts < 2) | (var_i <= 0) | (var_j <= 0)
+    C[undefined] = np.nan
+    
+    return _finalize_correlation_matrix(C, ~np.diag(undefined))
+
+def _rank_columns(X: np.ndarray, observed: Optional[np.ndarray] = None) -> np.ndarray:
+    """Rangs moyens de chaque colonne, calculés sur les valeurs observées (NaN conservés)"""
+    if BOTTLENECK_AVAILABLE:
+        return bn.nanrankdata(X, axis=0)
+    
+    if observed is None or observed.all():
+        return stats.rankdata(X, axis=0)
+    
+    R = np.full(X.shape, np.nan)
+    for j in range(X.shape[1]):
+        rows = observed[:, j]
+        R[rows, j] = stats.rankdata(X[rows, j])
+    return R
+
+def _pairwise_spearman_with_nan(X: np.ndarray, observed: np.ndarray) -> np.ndarray:
+    """
+    Matrice de corrélation de Spearman sur les observations complètes de chaque paire.
+    
+    Les colonnes sont classées une seule fois; une paire ne reclasse une colonne que si
+    des lignes de celle-ci sont exclues (valeur manquante dans l'autre colonne).
+    """
+    k = X.shape[1]
+    C = np.full((k, k), np.nan)
+    R = _rank_columns(X, observed)
+    observed_counts = observed.sum(axis=0)
+    
+    # Triangle supérieur strict uniquement: symétrie et diagonale fixées ensuite
+    for i, j in zip(*np.triu_indices(k, k=1)):
+        rows = observed[:, i] & observed[:, j]
+        n_rows = rows.sum()
+        if n_rows < 2:
+            continue
+        
+        a = R[rows, i] if n_rows == observed_counts[i] else stats.rankdata(X[rows, i])
+        b = R[rows, j] if n_rows == observed_counts[j] else stats.rankdata(X[rows, j])
+        a -= a.mean()
+        b -= b.mean()
+        
+        denominator = np.sqrt(np.einsum('i,i->', a, a) * np.einsum('i,i->', b, b))
+        if denominator > 0:
+            C[i, j] = np.einsum('i,i->', a, b) / denominator
+    
+    # Diagonale indéfinie (NaN) pour une colonne constante, comme DataFrame.corr()
+    varies = np.where(observed, X, -np.inf).max(axis=0) > np.where(observed, X, np.inf).min(axis=0)
+    return _finalize_correlation_matrix(C, (observed_counts >= 2) & varies)
+
+def _parse_datetime_column(series: pd.Series, errors: str = "raise") -> pd.Series:
+    """Convertit une colonne en datetime en privilégiant le parseur ISO 8601 rapide"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    
+    try:
+        # Les données JSON arrivent en ISO 8601: on évite l'inférence de format par élément
+        return pd.to_datetime(series, format="ISO8601", cache=True)
+    except (ValueError, TypeError):
+        return pd.to_datetime(series, errors=errors, cache=True)
+
+def _batch_linregress(x: np.ndarray, Y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Régression linéaire simple sur toutes les colonnes de Y en un seul calcul vectorisé.
+    
+    x est partagé (n,) ou propre à chaque colonne (n, m). Les NaN sont ignorés
+    colonne par colonne. Retourne (pentes, coefficients r, p-values, nombre de points),
+    avec les mêmes conventions que scipy.stats.linregress; une série constante donne
+    r = 0 et p = 1 (et non NaN comme les versions récentes de scipy) pour rester sérialisable.
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    if Y.ndim == 1:
+        Y = Y[:, np.newaxis]
+    x = np.asarray(x, dtype=np.float64)
+    X = np.broadcast_to(x[:, np.newaxis] if x.ndim == 1 else x, Y.shape)
+    
+    valid = ~(np.isnan(X) | np.isnan(Y))
+    n = valid.sum(axis=0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = np.where(valid, X, 0.0).sum(axis=0) / n
+        y_mean = np.where(valid, Y, 0.0).sum(axis=0) / n
+        dx = np.where(valid, X - x_mean, 0.0)
+        dy = np.where(valid, Y - y_mean, 0.0)
+        
+        ssxm = np.einsum('ij,ij->j', dx, dx)
+        ssym = np.einsum('ij,ij->j', dy, dy)
+        ssxym = np.einsum('ij,ij->j', dx, dy)
+        
+        slope = ssxym / ssxm
+        r = np.where((ssxm == 0) | (ssym == 0), 0.0, ssxym / np.sqrt(ssxm * ssym))
+        r = np.clip(r, -1.0, 1.0)
+        
+        # Test t bilatéral sur r avec n - 2 degrés de liberté
+        dof = n - 2
+        tiny = 1.0e-20
+        t_stat = r * np.sqrt(dof / ((1.0 - r + tiny) * (1.0 + r + tiny)))
+        p_value = 2 * stats.t.sf(np.abs(t_stat), np.maximum(dof, 1))
+        p_value = np.where(n == 2, np.where(ssym == 0, 1.0, 0.0), p_value)
+    
+    insufficient = n < 2
+    slope[insufficient] = np.nan
+    r[insufficient] = np.nan
+    p_value[insufficient] = np.nan
+    
+    return slope, r, p_value, n
+
 class RCAAnalysisService:
     """Service d'analyse des causes racines"""
     
     def __init__(self):
-        self.analysis_history = []
+        self.analysis_history = deque(maxlen=settings.max_history_size)
+        self._history_index: Dict[str, Dict] = {}
         self.start_time = datetime.now()
+        self._system_metrics: Optional[Dict[str, float]] = None
+        self._system_metrics_ts = 0.0
     
     async def perform_rca_analysis(
         self,
-        data: List[Dict],
+        data: Union[List[Dict], pd.DataFrame],
         problem_description: str,
         affected_metrics: List[str],
         time_window: Optional[Dict[str, Any]] = None,
         analysis_depth: int = 3,
         include_correlations: bool = True,
         include_trend_analysis: bool = True,
-        include_anomaly_detection: bool = True
+        include_anomaly_detection: bool = True,
+        include_correlation_matrix: bool = False
     ) -> Dict[str, Any]:
         """Effectue une analyse des causes racines complète"""
         
@@ -45,7 +403,13 @@ class RCAAnalysisService:
         analysis_id = str(uuid.uuid4())
         
         try:
-            df = pd.DataFrame(data)
+            df = data if isinstance(data, pd.DataFrame) else _to_dataframe(data)
+            numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+            
+            # Matrice de corrélation calculée une seule fois, partagée par les étapes
+            correlation_matrix = None
+            if len(numeric_columns) > 1:
+                correlation_matrix = _pearson_correlation_frame(df, numeric_columns)
             
             # Résumé du problème
             problem_summary = await self._generate_problem_summary(
@@ -54,7 +418,7 @@ class RCAAnalysisService:
             
             # Analyse des causes racines
             root_causes = await self._identify_root_causes(
-                df, affected_metrics, analysis_depth
+                df, affected_metrics, analysis_depth, numeric_columns, correlation_matrix
             )
             
             # Facteurs contributifs
@@ -66,7 +430,9 @@ class RCAAnalysisService:
             correlation_analysis = None
             if include_correlations:
                 correlation_analysis = await self._analyze_correlations(
-                    df, affected_metrics
+                    df, affected_metrics, numeric_columns,
+                    include_full_matrix=include_correlation_matrix,
+                    correlation_matrix=correlation_matrix
                 )
             
             trend_analysis = None
@@ -94,7 +460,7 @@ class RCAAnalysisService:
             execution_time = time.time() - start_time
             
             # Enregistrement dans l'historique
-            self.analysis_history.append({
+            self._record_analysis({
                 "analysis_id": analysis_id,
                 "problem_description": problem_description,
                 "affected_metrics": affected_metrics,
@@ -122,6 +488,15 @@ class RCAAnalysisService:
             logger.error(f"Erreur lors de l'analyse RCA {analysis_id}: {str(e)}")
             raise e
     
+    def _record_analysis(self, entry: Dict[str, Any]) -> None:
+        """Ajoute une analyse à l'historique borné et maintient l'index par ID"""
+        if len(self.analysis_history) == self.analysis_history.maxlen:
+            evicted = self.analysis_history[0]
+            self._history_index.pop(evicted["analysis_id"], None)
+        
+        self.analysis_history.append(entry)
+        self._history_index[entry["analysis_id"]] = entry
+    
     async def _generate_problem_summary(
         self,
         problem_description: str,
@@ -146,7 +521,9 @@ class RCAAnalysisService:
         self,
         df: pd.DataFrame,
         affected_metrics: List[str],
-        analysis_depth: int
+        analysis_depth: int,
+        numeric_columns: Optional[List[str]] = None,
+        correlation_matrix: Optional[pd.DataFrame] = None
     ) -> List[Dict[str, Any]]:
         """Identifie les causes racines potentielles"""
         
@@ -177,19 +554,28 @@ class RCAAnalysisService:
                     })
         
         # Analyse des corrélations entre métriques
-        numeric_columns = df.select_dtypes(include=[np.number]).columns
+        if numeric_columns is None:
+            numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
         if len(numeric_columns) > 1:
-            correlation_matrix = df[numeric_columns].corr()
+            if correlation_matrix is None:
+                correlation_matrix = _pearson_correlation_frame(df, numeric_columns)
+            
+            correlation_values = np.abs(correlation_matrix.to_numpy())
+            column_positions = {column: idx for idx, column in enumerate(correlation_matrix.columns)}
             
             for metric in affected_metrics:
-                if metric in correlation_matrix.columns:
-                    # Recherche de corrélations fortes
-                    strong_correlations = correlation_matrix[metric].abs().sort_values(ascending=False)
-                    strong_correlations = strong_correlations[strong_correlations > 0.7]
-                    strong_correlations = strong_correlations[strong_correlations.index != metric]
+                if metric in column_positions:
+                    # Recherche de corrélations fortes: masque O(n), seul le sous-ensemble retenu est trié
+                    metric_idx = column_positions[metric]
+                    abs_correlations = correlation_values[:, metric_idx]
+                    keep = np.flatnonzero(abs_correlations > 0.7)
+                    keep = keep[keep != metric_idx]
+                    keep = keep[np.argsort(-abs_correlations[keep], kind="stable")]
                     
-                    if len(strong_correlations) > 0:
-                        for correlated_metric, correlation_value in strong_correlations.items():
+                    if len(keep) > 0:
+                        for idx in keep:
+                            correlated_metric = correlation_matrix.columns[idx]
+                            correlation_value = float(abs_correlations[idx])
                             root_causes.append({
                                 "type": "correlation_issue",
                                 "metric": metric,
@@ -259,36 +645,53 @@ class RCAAnalysisService:
     async def _analyze_correlations(
         self,
         df: pd.DataFrame,
-        affected_metrics: List[str]
+        affected_metrics: List[str],
+        numeric_columns: Optional[List[str]] = None,
+        include_full_matrix: bool = False,
+        correlation_matrix: Optional[pd.DataFrame] = None
     ) -> Dict[str, Any]:
         """Analyse les corrélations entre variables"""
         
-        numeric_columns = df.select_dtypes(include=[np.number]).columns
+        if numeric_columns is None:
+            numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
         
         if len(numeric_columns) < 2:
             return {"message": "Pas assez de colonnes numériques pour l'analyse de corrélation"}
         
-        correlation_matrix = df[numeric_columns].corr()
-        
-        # Identification des corrélations significatives
-        significant_correlations = []
-        for i, col1 in enumerate(correlation_matrix.columns):
-            for j, col2 in enumerate(correlation_matrix.columns):
-                if i < j:  # Éviter les doublons
-                    corr_value = correlation_matrix.loc[col1, col2]
-                    if abs(corr_value) > 0.5:  # Corrélation modérée à forte
-                        significant_correlations.append({
-                            "variable1": col1,
-                            "variable2": col2,
-                            "correlation": corr_value,
-                            "strength": "strong" if abs(corr_value) > 0.8 else "moderate"
-                        })
+        if correlation_matrix is None:
+            correlation_matrix = _pearson_correlation_frame(df, numeric_columns)
+        correlation_values = correlation_matrix.to_numpy()
+        
+        # Identification des corrélations significatives sur le triangle supérieur
+        rows, cols = np.triu_indices(len(numeric_columns), k=1)
+        pair_values = correlation_values[rows, cols]
+        significant = np.abs(pair_values) > 0.5  # Corrélation modérée à forte
+        
+        significant_correlations = [
+            {
+                "variable1": numeric_columns[i],
+                "variable2": numeric_columns[j],
+                "correlation": corr_value,
+                "strength": "strong" if abs(corr_value) > 0.8 else "moderate"
+            }
+            for i, j, corr_value in zip(
+                rows[significant].tolist(),
+                cols[significant].tolist(),
+                pair_values[significant].tolist()
+            )
+        ]
         
-        return {
-            "correlation_matrix": correlation_matrix.to_dict(),
+        result = {
+            "variables": list(numeric_columns),
             "significant_correlations": significant_correlations,
             "summary": f"{len(significant_correlations)} corrélations significatives trouvées"
         }
+        
+        # La matrice complète (n² valeurs) n'est sérialisée que sur demande
+        if include_full_matrix:
+            result["correlation_matrix"] = correlation_matrix.to_dict()
+        
+        return result
     
     async def _analyze_trends(
         self,
@@ -301,11 +704,16 @@ class RCAAnalysisService:
         # Pour la démo, on simule une analyse de tendance
         trends = []
         
-        for metric in affected_metrics:
+        # Tirages aléatoires générés en une fois pour toutes les métriques
+        rng = np.random.default_rng()
+        increasing_draws = (rng.random(len(affected_metrics)) > 0.5).tolist()
+        strength_draws = rng.uniform(0.1, 0.9, len(affected_metrics)).tolist()
+        
+        for i, metric in enumerate(affected_metrics):
             if metric in df.columns and df[metric].dtype in ['int64', 'float64']:
                 # Simulation d'une tendance
-                trend_direction = "increasing" if np.random.random() > 0.5 else "decreasing"
-                trend_strength = np.random.uniform(0.1, 0.9)
+                trend_direction = "increasing" if increasing_draws[i] else "decreasing"
+                trend_strength = strength_draws[i]
                 
                 trends.append({
                     "metric": metric,
@@ -396,7 +804,7 @@ class RCAAnalysisService:
         recommendations.append("Implémenter un système d'alertes proactives")
         recommendations.append("Créer des tableaux de bord de monitoring en temps réel")
         
-        return list(set(recommendations))  # Supprimer les doublons
+        return list(dict.fromkeys(recommendations))  # Supprimer les doublons en conservant l'ordre
     
     async def _calculate_confidence_score(
         self,
@@ -436,35 +844,37 @@ class RCAAnalysisService:
         try:
             # Conversion de la colonne de temps si nécessaire
             if not pd.api.types.is_datetime64_any_dtype(df[time_column]):
-                df[time_column] = pd.to_datetime(df[time_column], errors='coerce')
+                df[time_column] = _parse_datetime_column(df[time_column], errors='coerce')
             
-            # Analyse des tendances par métrique
-            for metric in affected_metrics:
-                if metric in df.columns and df[metric].dtype in ['int64', 'float64']:
-                    # Tri par temps et calcul de la tendance
-                    df_sorted = df.sort_values(time_column)
-                    if len(df_sorted) > 1:
-                        # Régression linéaire simple pour détecter la tendance
-                        x = np.arange(len(df_sorted))
-                        y = df_sorted[metric].values
-                        
-                        if not np.isnan(y).all():
-                            slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
-                            
-                            if abs(r_value) > 0.5:  # Corrélation significative avec le temps
-                                patterns.append({
-                                    "type": "temporal_pattern",
-                                    "metric": metric,
-                                    "description": f"Tendance temporelle détectée dans {metric}",
-                                    "severity": "medium",
-                                    "evidence": {
-                                        "slope": slope,
-                                        "correlation": r_value,
-                                        "p_value": p_value,
-                                        "trend_direction": "increasing" if slope > 0 else "decreasing"
-                                    },
-                                    "confidence": abs(r_value)
-                                })
+            trend_metrics = [
+                metric for metric in affected_metrics
+                if metric in df.columns and df[metric].dtype in ['int64', 'float64']
+            ]
+            
+            # Tri par temps puis régression linéaire de toutes les métriques en un seul calcul
+            df_sorted = df.sort_values(time_column)
+            if trend_metrics and len(df_sorted) > 1:
+                x = np.arange(len(df_sorted))
+                Y = df_sorted[trend_metrics].to_numpy(dtype=np.float64)
+                slopes, r_values, p_values, _ = _batch_linregress(x, Y)
+                
+                for metric, slope, r_value, p_value in zip(
+                    trend_metrics, slopes.tolist(), r_values.tolist(), p_values.tolist()
+                ):
+                    if abs(r_value) > 0.5:  # Corrélation significative avec le temps
+                        patterns.append({
+                            "type": "temporal_pattern",
+                            "metric": metric,
+                            "description": f"Tendance temporelle détectée dans {metric}",
+                            "severity": "medium",
+                            "evidence": {
+                                "slope": slope,
+                                "correlation": r_value,
+                                "p_value": p_value,
+                                "trend_direction": "increasing" if slope > 0 else "decreasing"
+                            },
+                            "confidence": abs(r_value)
+                        })
         
         except Exception as e:
             logger.warning(f"Erreur lors de l'analyse des patterns temporels: {str(e)}")
@@ -480,39 +890,47 @@ class RCAAnalysisService:
     ) -> Dict[str, Any]:
         """Analyse des tendances temporelles détaillées"""
         
-        df = pd.DataFrame(data)
+        df = _to_dataframe(data)
         trends = []
         
         try:
-            df[time_field] = pd.to_datetime(df[time_field])
-            
-            for metric in metrics:
-                if metric in df.columns and df[metric].dtype in ['int64', 'float64']:
-                    # Agrégation par période
-                    if trend_period == "daily":
-                        df_agg = df.groupby(df[time_field].dt.date)[metric].agg(['mean', 'std', 'count'])
-                    elif trend_period == "weekly":
-                        df_agg = df.groupby(df[time_field].dt.to_period('W'))[metric].agg(['mean', 'std', 'count'])
-                    elif trend_period == "monthly":
-                        df_agg = df.groupby(df[time_field].dt.to_period('M'))[metric].agg(['mean', 'std', 'count'])
-                    else:
-                        df_agg = df.groupby(df[time_field].dt.date)[metric].agg(['mean', 'std', 'count'])
-                    
+            df[time_field] = _parse_datetime_column(df[time_field])
+            
+            trend_metrics = [
+                metric for metric in metrics
+                if metric in df.columns and df[metric].dtype in ['int64', 'float64']
+            ]
+            
+            if trend_metrics:
+                # Agrégation par période en une seule passe pour toutes les métriques
+                frequency = TREND_PERIOD_FREQUENCIES.get(trend_period, "D")
+                df_agg_all = (
+                    df.set_index(time_field)[trend_metrics]
+                    .resample(frequency)
+                    .agg(['mean', 'std', 'count'])
+                )
+                
+                # Les périodes sans observation sont ignorées, comme avec un groupby:
+                # l'abscisse de chaque métrique est le rang de ses périodes non vides
+                means = df_agg_all.xs('mean', axis=1, level=1)[trend_metrics].to_numpy(dtype=np.float64)
+                counts = df_agg_all.xs('count', axis=1, level=1)[trend_metrics].to_numpy()
+                observed = counts > 0
+                means = np.where(observed, means, np.nan)
+                positions = np.where(observed, np.cumsum(observed, axis=0) - 1, np.nan)
+                
+                slopes, r_values, p_values, data_points = _batch_linregress(positions, means)
+                
+                for j, metric in enumerate(trend_metrics):
                     # Calcul de la tendance
-                    if len(df_agg) > 1:
-                        x = np.arange(len(df_agg))
-                        y = df_agg['mean'].values
-                        
-                        slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
-                        
+                    if data_points[j] > 1:
                         trends.append({
                             "metric": metric,
                             "period": trend_period,
-                            "trend_slope": slope,
-                            "correlation": r_value,
-                            "significance": p_value,
-                            "trend_strength": abs(r_value),
-                            "data_points": len(df_agg)
+                            "trend_slope": float(slopes[j]),
+                            "correlation": float(r_values[j]),
+                            "significance": float(p_values[j]),
+                            "trend_strength": abs(float(r_values[j])),
+                            "data_points": int(data_points[j])
                         })
         
         except Exception as e:
@@ -533,7 +951,7 @@ class RCAAnalysisService:
     ) -> Dict[str, Any]:
         """Détection d'anomalies avancée"""
         
-        df = pd.DataFrame(data)
+        df = _to_dataframe(data)
         anomalies = []
         
         try:
@@ -592,19 +1010,21 @@ class RCAAnalysisService:
     ) -> Dict[str, Any]:
         """Analyse de l'impact des problèmes"""
         
-        df = pd.DataFrame(data)
+        df = _to_dataframe(data)
         impact_analysis = []
         
-        for event in problem_events:
+        # Scores d'impact simulés tirés en une fois pour tous les événements
+        available_metrics = [metric for metric in impact_metrics if metric in df.columns]
+        simulated_scores = np.random.default_rng().uniform(
+            0, 1, (len(problem_events), len(available_metrics))
+        ).tolist()
+        
+        for event, event_scores in zip(problem_events, simulated_scores):
             event_time = event.get("timestamp")
             event_type = event.get("type", "unknown")
             
             # Simulation de l'analyse d'impact
-            impact_scores = {}
-            for metric in impact_metrics:
-                if metric in df.columns:
-                    # Calcul d'un score d'impact simulé
-                    impact_scores[metric] = np.random.uniform(0, 1)
+            impact_scores = dict(zip(available_metrics, event_scores))
             
             impact_analysis.append({
                 "event_type": event_type,
@@ -627,17 +1047,17 @@ class RCAAnalysisService:
     ) -> Dict[str, Any]:
         """Prédiction des échecs futurs"""
         
-        df = pd.DataFrame(data)
+        df = _to_dataframe(data)
         
         try:
-            numeric_columns = df.select_dtypes(include=[np.number]).columns
+            numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
             
             if len(numeric_columns) == 0:
                 return {"error": "Aucune colonne numérique trouvée pour la prédiction"}
             
-            # Préparation des données
-            X = df[numeric_columns].fillna(0)
-            scaler = StandardScaler()
+            # Préparation des données (float32 pour réduire la bande passante mémoire)
+            X = df[numeric_columns].to_numpy(dtype=np.float32, na_value=0.0, copy=True)
+            scaler = StandardScaler(copy=False)
             X_scaled = scaler.fit_transform(X)
             
             if model == "isolation_forest":
@@ -647,19 +1067,32 @@ class RCAAnalysisService:
                 # Méthode par défaut: détection statistique
                 anomaly_scores = np.mean(np.abs(X_scaled), axis=1)
             
-            # Normalisation des scores
-            anomaly_scores = (anomaly_scores - np.min(anomaly_scores)) / (np.max(anomaly_scores) - np.min(anomaly_scores))
+            # Normalisation min-max en place (évite les tableaux temporaires)
+            score_min = anomaly_scores.min()
+            score_range = max(float(np.ptp(anomaly_scores)), 1e-12)
+            np.subtract(anomaly_scores, score_min, out=anomaly_scores)
+            np.divide(anomaly_scores, score_range, out=anomaly_scores)
             
             # Identification des risques
             high_risk_indices = np.where(anomaly_scores > warning_threshold)[0]
             
-            predictions = []
-            for i, score in enumerate(anomaly_scores):
-                predictions.append({
+            # Classification vectorisée des niveaux de risque
+            risk_levels = np.where(
+                anomaly_scores > warning_threshold,
+                "high",
+                np.where(anomaly_scores > 0.5, "medium", "low")
+            )
+            
+            predictions = [
+                {
                     "record_index": i,
                     "failure_probability": score,
-                    "risk_level": "high" if score > warning_threshold else "medium" if score > 0.5 else "low"
-                })
+                    "risk_level": risk_level
+                }
+                for i, (score, risk_level) in enumerate(
+                    zip(anomaly_scores.tolist(), risk_levels.tolist())
+                )
+            ]
             
             return {
                 "predictions": predictions,
@@ -674,14 +1107,11 @@ class RCAAnalysisService:
     
     async def get_analysis_history(self, limit: int = 100, offset: int = 0) -> List[Dict]:
         """Récupère l'historique des analyses"""
-        return self.analysis_history[offset:offset+limit]
+        return list(islice(self.analysis_history, offset, offset + limit))
     
     async def get_analysis_by_id(self, analysis_id: str) -> Optional[Dict]:
         """Récupère une analyse par son ID"""
-        for analysis in self.analysis_history:
-            if analysis["analysis_id"] == analysis_id:
-                return analysis
-        return None
+        return self._history_index.get(analysis_id)
     
     async def generate_report(
         self,
@@ -710,24 +1140,49 @@ class RCAAnalysisService:
         total_analyses = len(self.analysis_history)
         
         uptime = (datetime.now() - self.start_time).total_seconds()
+        system_metrics = self._get_system_metrics()
         
         return {
             "total_rca_analyses": total_analyses,
             "uptime_seconds": uptime,
-            "memory_usage_mb": psutil.virtual_memory().used / 1024 / 1024,
-            "cpu_usage_percent": psutil.cpu_percent(),
+            "memory_usage_mb": system_metrics["memory_usage_mb"],
+            "cpu_usage_percent": system_metrics["cpu_usage_percent"],
             "last_updated": datetime.now().isoformat()
         }
+    
+    def _get_system_metrics(self) -> Dict[str, float]:
+        """Lit les métriques système psutil avec un cache de courte durée"""
+        now = time.monotonic()
+        if self._system_metrics is None or now - self._system_metrics_ts >= settings.system_metrics_ttl:
+            self._system_metrics = {
+                "memory_usage_mb": psutil.virtual_memory().used / 1024 / 1024,
+                # interval=None: lecture non bloquante depuis le dernier échantillon
+                "cpu_usage_percent": psutil.cpu_percent(interval=None)
+            }
+            self._system_metrics_ts = now
+        
+        return self._system_metrics
+
+# Insertion groupée de l'historique des corrélations dans la table rca_analyses
+_CORRELATION_HISTORY_INSERT = """
+    INSERT INTO rca_analyses (id, analysis_type, problem_description, analysis_config, executed_at)
+    VALUES (:id, 'correlation', :problem_description, CAST(:analysis_config AS JSONB), :executed_at)
+"""
 
 class CorrelationAnalysisService:
     """Service d'analyse de corrélation"""
     
     def __init__(self):
-        self.analysis_history = []
+        # Entrées minimales (analysis_id, method, variables_analyzed, significant_correlations,
+        # execution_time, timestamp), vidées périodiquement vers la base si activé
+        self.analysis_history = deque(maxlen=settings.max_history_size)
+        self._history_engine = None
+        # Matrices préparées, indexées par (empreinte calculée des colonnes, variables demandées)
+        self._prepared_cache: "OrderedDict[Tuple[bytes, Tuple[str, ...]], Dict[str, Any]]" = OrderedDict()
     
     async def analyze_correlations(
         self,
-        data: List[Dict],
+        data: Union[List[Dict], pd.DataFrame, Dict[str, Optional[np.ndarray]]],
         variables: List[str],
         method: str = "pearson",
         significance_threshold: float = 0.05,
@@ -739,74 +1194,94 @@ class CorrelationAnalysisService:
         analysis_id = str(uuid.uuid4())
         
         try:
-            df = pd.DataFrame(data)
+            prepared = self._get_prepared_matrix(data, variables)
+            numeric_vars = prepared["numeric_vars"]
+            X = prepared["X"]
+            observed = prepared["observed"]
+            has_missing = not observed.all()
             
-            # Vérification des variables disponibles
-            available_vars = [var for var in variables if var in df.columns]
-            if len(available_vars) < 2:
-                raise ValueError("Au moins 2 variables doivent être disponibles")
+            # Nombre d'observations communes à chaque paire de variables
+            if has_missing:
+                M = observed.astype(np.float64)
+                pair_counts = M.T @ M
+            else:
+                pair_counts = np.full((len(numeric_vars), len(numeric_vars)), float(len(X)))
             
-            # Sélection des colonnes numériques
-            numeric_vars = []
-            for var in available_vars:
-                if df[var].dtype in ['int64', 'float64']:
-                    numeric_vars.append(var)
+            # Calcul vectorisé de la matrice de corrélation complète
+            if method == "pearson":
+                # Sans valeur manquante, un seul GEMM suffit (pas de vérification NaN par paire)
+                if has_missing:
+                    C = _pairwise_pearson_with_nan(X, observed, pair_counts)
+                else:
+                    C = _fast_pearson_no_nan(X, settings.correlation_memory_limit)
+            elif method == "spearman":
+                if has_missing:
+                    C = _pairwise_spearman_with_nan(X, observed)
+                else:
+                    # Rangs calculés une seule fois par jeu de données préparé
+                    if prepared.get("ranks") is None:
+                        prepared["ranks"] = _rank_columns(X)
+                    C = _fast_pearson_no_nan(prepared["ranks"], settings.correlation_memory_limit)
+            else:
+                # Autre méthode (kendall): corrélation par paires complètes
+                C = _dataframe_corr(pd.DataFrame(X, columns=numeric_vars), method).to_numpy()
             
-            if len(numeric_vars) < 2:
-                raise ValueError("Au moins 2 variables numériques sont requises")
+            if method in ("pearson", "spearman"):
+                P = self._correlation_p_values(C, pair_counts)
+            else:
+                P = np.full_like(C, 0.05)  # Approximation
             
-            # Calcul de la matrice de corrélation
-            correlation_matrix = {}
-            significant_correlations = []
+            correlation_matrix = {
+                var: dict(zip(numeric_vars, row))
+                for var, row in zip(numeric_vars, C.tolist())
+            }
             correlation_strength = {}
             
-            for i, var1 in enumerate(numeric_vars):
-                correlation_matrix[var1] = {}
-                
-                for j, var2 in enumerate(numeric_vars):
-                    if i <= j:  # Éviter les doublons
-                        if method == "pearson":
-                            corr, p_value = pearsonr(df[var1].dropna(), df[var2].dropna())
-                        elif method == "spearman":
-                            corr, p_value = spearmanr(df[var1].dropna(), df[var2].dropna())
-                        else:
-                            corr = df[var1].corr(df[var2], method=method)
-                            p_value = 0.05  # Approximation
-                        
-                        correlation_matrix[var1][var2] = corr
-                        correlation_matrix[var2][var1] = corr  # Symétrie
-                        
-                        # Identification des corrélations significatives
-                        if abs(corr) >= min_correlation_strength and p_value <= significance_threshold:
-                            significant_correlations.append({
-                                "variable1": var1,
-                                "variable2": var2,
-                                "correlation": corr,
-                                "p_value": p_value,
-                                "strength": self._get_correlation_strength(abs(corr))
-                            })
+            # Identification des corrélations significatives sur le triangle supérieur
+            rows, cols = np.triu_indices(len(numeric_vars), k=1)
+            pair_corrs = C[rows, cols]
+            pair_p_values = P[rows, cols]
+            significant = (
+                (np.abs(pair_corrs) >= min_correlation_strength)
+                & (pair_p_values <= significance_threshold)
+            )
+            
+            # Corrélations significatives conservées en tableaux parallèles jusqu'à la réponse
+            significant_pairs = {
+                "variable1": rows[significant],
+                "variable2": cols[significant],
+                "correlation": pair_corrs[significant],
+                "p_value": pair_p_values[significant]
+            }
             
-            # Classification de la force des corrélations
-            for var in numeric_vars:
-                correlations = [abs(corr) for corr in correlation_matrix[var].values() if not np.isnan(corr)]
-                if correlations:
-                    max_corr = max(correlations)
-                    correlation_strength[var] = self._get_correlation_strength(max_corr)
+            # Classification de la force des corrélations: plus forte corrélation hors diagonale
+            abs_C = np.abs(C)
+            np.fill_diagonal(abs_C, np.nan)
+            has_correlation = ~np.isnan(abs_C).all(axis=1)
+            if has_correlation.any():
+                max_per_var = np.nanmax(abs_C[has_correlation], axis=1)
+                strengths = self._classify_correlation_strengths(max_per_var)
+                correlation_strength = dict(zip(
+                    np.asarray(numeric_vars)[has_correlation].tolist(),
+                    strengths.tolist()
+                ))
             
             # Génération d'insights
-            insights = self._generate_correlation_insights(significant_correlations, correlation_strength)
+            insights = self._generate_correlation_insights(
+                significant_pairs, numeric_vars, correlation_strength
+            )
+            
+            significant_correlations = self._format_significant_correlations(
+                significant_pairs, numeric_vars
+            )
             
             execution_time = time.time() - start_time
             
             # Enregistrement dans l'historique
-            self.analysis_history.append({
-                "analysis_id": analysis_id,
-                "method": method,
-                "variables_analyzed": len(numeric_vars),
-                "significant_correlations": len(significant_correlations),
-                "execution_time": execution_time,
-                "timestamp": datetime.now()
-            })
+            self.analysis_history.append((
+                analysis_id, method, len(numeric_vars), len(significant_correlations),
+                execution_time, time.time()
+            ))
             
             return {
                 "analysis_id": analysis_id,
@@ -821,52 +1296,246 @@ class CorrelationAnalysisService:
             logger.error(f"Erreur lors de l'analyse de corrélation {analysis_id}: {str(e)}")
             raise e
     
-    def _get_correlation_strength(self, correlation_value: float) -> str:
-        """Détermine la force de la corrélation"""
-        abs_corr = abs(correlation_value)
-        
-        if abs_corr >= 0.8:
-            return "very_strong"
-        elif abs_corr >= 0.6:
-            return "strong"
-        elif abs_corr >= 0.4:
-            return "moderate"
-        elif abs_corr >= 0.2:
-            return "weak"
-        else:
-            return "very_weak"
+    def should_flush_history(self) -> bool:
+        """Indique si assez d'entrées sont en attente pour une écriture groupée en base"""
+        return (
+            settings.history_flush_enabled
+            and len(self.analysis_history) >= settings.history_flush_batch_size
+        )
+    
+    async def flush_history(self) -> int:
+        """Vide l'historique en mémoire vers la table rca_analyses (écriture groupée)"""
+        batch = []
+        while self.analysis_history:
+            batch.append(self.analysis_history.popleft())
+        if not batch:
+            return 0
+        
+        rows = [
+            {
+                "id": analysis_id,
+                "problem_description": f"Analyse de corrélation ({method})",
+                "analysis_config": json.dumps({
+                    "method": method,
+                    "variables_analyzed": variables_analyzed,
+                    "significant_correlations": significant_count,
+                    "execution_time": execution_time
+                }),
+                "executed_at": datetime.fromtimestamp(timestamp)
+            }
+            for analysis_id, method, variables_analyzed, significant_count, execution_time, timestamp in batch
+        ]
+        
+        try:
+            await asyncio.to_thread(self._insert_history_rows, rows)
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'écriture de l'historique des corrélations: {str(e)}")
+            # Remise en file pour le prochain essai, sans évincer les entrées plus récentes
+            free_slots = self.analysis_history.maxlen - len(self.analysis_history)
+            if free_slots > 0:
+                self.analysis_history.extendleft(reversed(batch[-free_slots:]))
+            return 0
+    
+    def _insert_history_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """Exécute l'insertion groupée (appelée hors de la boucle d'événements)"""
+        from sqlalchemy import create_engine, text
+        
+        if self._history_engine is None:
+            self._history_engine = create_engine(
+                settings.database_url,
+                pool_size=settings.database_pool_size,
+                max_overflow=settings.database_max_overflow
+            )
+        
+        with self._history_engine.begin() as connection:
+            connection.execute(text(_CORRELATION_HISTORY_INSERT), rows)
+    
+    def _prepare_matrix(
+        self,
+        data: Union[List[Dict], pd.DataFrame, Dict[str, Optional[np.ndarray]]],
+        variables: List[str]
+    ) -> Dict[str, Any]:
+        """Construit la matrice float64 des variables numériques demandées"""
+        if isinstance(data, dict):
+            return self._prepare_matrix_from_columns(data, variables)
+        
+        df = data if isinstance(data, pd.DataFrame) else _to_dataframe(data)
+        
+        # Vérification des variables disponibles
+        available_vars = [var for var in variables if var in df.columns]
+        if len(available_vars) < 2:
+            raise ValueError("Au moins 2 variables doivent être disponibles")
+        
+        # Sélection des colonnes numériques (tous les types numériques, y compris nullables)
+        numeric_df = df[available_vars].select_dtypes(include=[np.number])
+        numeric_vars = list(numeric_df.columns)
+        
+        if len(numeric_vars) < 2:
+            raise ValueError("Au moins 2 variables numériques sont requises")
+        
+        X = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+        
+        return {
+            "numeric_vars": numeric_vars,
+            "X": X,
+            "observed": ~np.isnan(X),
+            "ranks": None
+        }
+    
+    def _prepare_matrix_from_columns(
+        self,
+        columns: Dict[str, Optional[np.ndarray]],
+        variables: List[str]
+    ) -> Dict[str, Any]:
+        """Construit la matrice à partir de colonnes déjà converties (voir records_to_columns)"""
+        available_vars = [var for var in variables if var in columns]
+        if len(available_vars) < 2:
+            raise ValueError("Au moins 2 variables doivent être disponibles")
+        
+        numeric_vars = [var for var in available_vars if columns[var] is not None]
+        if len(numeric_vars) < 2:
+            raise ValueError("Au moins 2 variables numériques sont requises")
+        
+        X = np.column_stack([columns[var] for var in numeric_vars])
+        
+        return {
+            "numeric_vars": numeric_vars,
+            "X": X,
+            "observed": ~np.isnan(X),
+            "ranks": None
+        }
+    
+    def _data_digest(
+        self,
+        data: Union[List[Dict], pd.DataFrame, Dict[str, Optional[np.ndarray]]],
+        variables: List[str]
+    ) -> Optional[bytes]:
+        """
+        Empreinte des colonnes demandées, calculée sur leurs buffers (noms, types et valeurs)
+        
+        Les listes d'enregistrements ne sont pas hachées: les convertir coûterait autant
+        que la préparation elle-même.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        
+        if isinstance(data, dict):
+            for var in variables:
+                if var not in data:
+                    continue
+                column = data[var]
+                digest.update(var.encode() + b"\0")
+                if column is None:
+                    digest.update(b"\0")
+                else:
+                    digest.update(str(column.dtype).encode() + str(len(column)).encode())
+                    digest.update(np.ascontiguousarray(column).tobytes())
+            return digest.digest()
+        
+        if isinstance(data, pd.DataFrame):
+            columns = [var for var in variables if var in data.columns]
+            digest.update(repr([(var, str(data[var].dtype)) for var in columns]).encode())
+            digest.update(pd.util.hash_pandas_object(data[columns], index=False).to_numpy().tobytes())
+            return digest.digest()
+        
+        return None
+    
+    def _get_prepared_matrix(
+        self,
+        data: Union[List[Dict], pd.DataFrame, Dict[str, Optional[np.ndarray]]],
+        variables: List[str]
+    ) -> Dict[str, Any]:
+        """Retourne la matrice préparée, réutilisée pour des colonnes identiques (empreinte calculée ici)"""
+        data_digest = self._data_digest(data, variables) if settings.cache_enabled else None
+        if data_digest is None:
+            return self._prepare_matrix(data, variables)
+        
+        cache_key = (data_digest, tuple(variables))
+        prepared = self._prepared_cache.get(cache_key)
+        if prepared is not None:
+            self._prepared_cache.move_to_end(cache_key)
+            return prepared
+        
+        prepared = self._prepare_matrix(data, variables)
+        self._prepared_cache[cache_key] = prepared
+        if len(self._prepared_cache) > settings.max_cache_size:
+            self._prepared_cache.popitem(last=False)
+        
+        return prepared
+    
+    def _correlation_p_values(self, C: np.ndarray, pair_counts: np.ndarray) -> np.ndarray:
+        """P-values bilatérales (test t à n - 2 degrés de liberté) pour toute la matrice"""
+        dof = pair_counts - 2
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_stat = C * np.sqrt(dof / ((1.0 - C) * (1.0 + C)))
+            p_values = 2 * stats.t.sf(np.abs(t_stat), np.maximum(dof, 1))
+        
+        # Avec deux observations ou moins, la corrélation n'est pas testable
+        return np.where(dof > 0, p_values, 1.0)
+    
+    def _classify_correlation_strengths(self, correlation_values: np.ndarray) -> np.ndarray:
+        """Détermine la force de plusieurs corrélations en une seule opération vectorisée"""
+        return _STRENGTH_LABELS[np.searchsorted(_STRENGTH_BINS, np.abs(correlation_values), side="right")]
+    
+    def _format_significant_correlations(
+        self,
+        significant_pairs: Dict[str, np.ndarray],
+        numeric_vars: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Matérialise les corrélations significatives sous forme de liste de dictionnaires"""
+        strengths = self._classify_correlation_strengths(significant_pairs["correlation"])
+        
+        return [
+            {
+                "variable1": numeric_vars[i],
+                "variable2": numeric_vars[j],
+                "correlation": corr,
+                "p_value": p_value,
+                "strength": strength
+            }
+            for i, j, corr, p_value, strength in zip(
+                significant_pairs["variable1"].tolist(),
+                significant_pairs["variable2"].tolist(),
+                significant_pairs["correlation"].tolist(),
+                significant_pairs["p_value"].tolist(),
+                strengths.tolist()
+            )
+        ]
     
     def _generate_correlation_insights(
         self,
-        significant_correlations: List[Dict],
+        significant_pairs: Dict[str, np.ndarray],
+        numeric_vars: List[str],
         correlation_strength: Dict[str, str]
     ) -> List[str]:
         """Génère des insights basés sur les corrélations"""
         
         insights = []
+        correlations = significant_pairs["correlation"]
         
         # Insight sur le nombre de corrélations significatives
-        insights.append(f"{len(significant_correlations)} corrélations significatives détectées")
+        insights.append(f"{len(correlations)} corrélations significatives détectées")
+        
+        if len(correlations) == 0:
+            return insights
         
         # Insight sur les variables les plus corrélées
-        if significant_correlations:
-            strongest_corr = max(significant_correlations, key=lambda x: abs(x['correlation']))
-            insights.append(
-                f"Corrélation la plus forte: {strongest_corr['variable1']} et "
-                f"{strongest_corr['variable2']} (r={strongest_corr['correlation']:.3f})"
-            )
+        strongest = int(np.argmax(np.abs(correlations)))
+        insights.append(
+            f"Corrélation la plus forte: {numeric_vars[significant_pairs['variable1'][strongest]]} et "
+            f"{numeric_vars[significant_pairs['variable2'][strongest]]} (r={correlations[strongest]:.3f})"
+        )
         
         # Insight sur les variables avec corrélations multiples
-        var_counts = {}
-        for corr in significant_correlations:
-            for var in [corr['variable1'], corr['variable2']]:
-                var_counts[var] = var_counts.get(var, 0) + 1
-        
-        if var_counts:
-            most_correlated_var = max(var_counts, key=var_counts.get)
-            insights.append(
-                f"Variable la plus corrélée: {most_correlated_var} "
-                f"({var_counts[most_correlated_var]} corrélations)"
-            )
+        var_counts = np.bincount(
+            np.concatenate([significant_pairs["variable1"], significant_pairs["variable2"]]),
+            minlength=len(numeric_vars)
+        )
+        most_correlated = int(np.argmax(var_counts))
+        insights.append(
+            f"Variable la plus corrélée: {numeric_vars[most_correlated]} "
+            f"({var_counts[most_correlated]} corrélations)"
+        )
         
         return insights
@@ -45,12 +45,22 @@ class Settings(BaseSettings):
     max_batch_size: int = 10000
     analysis_timeout: int = 600  # 10 minutes
     correlation_timeout: int = 300  # 5 minutes
+    correlation_memory_limit: int = 256 * 1024 * 1024  # octets par bloc centré
+    use_gpu: bool = False
+    gpu_offload_threshold: int = 512 * 1024 * 1024  # octets (taille de X)
+    distributed_corr_enabled: bool = False
+    distributed_corr_min_rows: int = 1_000_000
     
     # Configuration de cache
     cache_enabled: bool = True
     cache_ttl: int = 3600  # 1 heure
     max_cache_size: int = 1000
     
+    # Configuration de l'historique
+    max_history_size: int = 10000
+    history_flush_enabled: bool = False
+    history_flush_batch_size: int = 100
+    
     # Configuration de reporting
     report_formats: List[str] = ["json", "html", "pdf"]
     default_report_format: str = "json"
@@ -74,6 +84,7 @@ class Settings(BaseSettings):
     # Configuration de monitoring
     metrics_enabled: bool = True
     health_check_interval: int = 30
+    system_metrics_ttl: float = 1.0  # secondes
     
     # Configuration des alertes
     alert_enabled: bool = True
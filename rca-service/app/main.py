@@ -3,15 +3,19 @@ Service RCA (Root Cause Analysis)
 Ce service analyse les causes racines des problèmes de données
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query, Request
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, PrivateAttr, model_validator
 from typing import Dict, List, Any, Optional
 import asyncio
 import logging
 from datetime import datetime
 import json
 
-from analysis import RCAAnalysisService, CorrelationAnalysisService
+from analysis import (
+    RCAAnalysisService, CorrelationAnalysisService,
+    arrow_stream_to_dataframe, records_to_columns
+)
 from config import settings
 
 # Configuration du logging
@@ -21,7 +25,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="RCA Service",
     description="Service d'analyse des causes racines et corrélations",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Initialisation des services
@@ -38,6 +43,7 @@ class RCAAnalysisRequest(BaseModel):
     include_correlations: bool = True
     include_trend_analysis: bool = True
     include_anomaly_detection: bool = True
+    include_correlation_matrix: bool = False
 
 class RCAAnalysisResponse(BaseModel):
     """Réponse d'analyse des causes racines"""
@@ -61,6 +67,19 @@ class CorrelationAnalysisRequest(BaseModel):
     correlation_method: str = "pearson"
     significance_threshold: float = 0.05
     min_correlation_strength: float = 0.3
+    
+    _columns: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    
+    @model_validator(mode="after")
+    def _build_columns(self) -> "CorrelationAnalysisRequest":
+        """Convertit une seule fois les lignes en colonnes NumPy (variables demandées)"""
+        self._columns = records_to_columns(self.data, self.variables)
+        return self
+    
+    @property
+    def columns(self) -> Dict[str, Any]:
+        """Colonnes float64 construites à la validation"""
+        return self._columns
 
 class CorrelationAnalysisResponse(BaseModel):
     """Réponse d'analyse de corrélation"""
@@ -98,7 +117,8 @@ async def analyze_root_causes(request: RCAAnalysisRequest, background_tasks: Bac
             analysis_depth=request.analysis_depth,
             include_correlations=request.include_correlations,
             include_trend_analysis=request.include_trend_analysis,
-            include_anomaly_detection=request.include_anomaly_detection
+            include_anomaly_detection=request.include_anomaly_detection,
+            include_correlation_matrix=request.include_correlation_matrix
         )
         
         return RCAAnalysisResponse(
@@ -121,19 +141,76 @@ async def analyze_root_causes(request: RCAAnalysisRequest, background_tasks: Bac
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/correlation", response_model=CorrelationAnalysisResponse)
-async def analyze_correlations(request: CorrelationAnalysisRequest):
+async def analyze_correlations(
+    request: CorrelationAnalysisRequest,
+    background_tasks: BackgroundTasks
+):
     """
     Analyse des corrélations entre variables
+    
+    Les appels successifs sur des colonnes identiques réutilisent la matrice préparée.
     """
     try:
         result = await correlation_service.analyze_correlations(
-            data=request.data,
+            data=request.columns,
             variables=request.variables,
             method=request.correlation_method,
             significance_threshold=request.significance_threshold,
             min_correlation_strength=request.min_correlation_strength
         )
         
+        if correlation_service.should_flush_history():
+            background_tasks.add_task(correlation_service.flush_history)
+        
+        return CorrelationAnalysisResponse(
+            analysis_id=result["analysis_id"],
+            correlation_matrix=result["correlation_matrix"],
+            significant_correlations=result["significant_correlations"],
+            correlation_strength=result["correlation_strength"],
+            insights=result["insights"],
+            execution_time=result["execution_time"],
+            timestamp=datetime.now()
+        )
+        
+    except Exception as e:
+        logger.error(f"Erreur lors de l'analyse de corrélation: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/correlation-binary", response_model=CorrelationAnalysisResponse)
+async def analyze_correlations_binary(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    variables: List[str] = Query(...),
+    correlation_method: str = "pearson",
+    significance_threshold: float = 0.05,
+    min_correlation_strength: float = 0.3
+):
+    """
+    Analyse des corrélations sur des données envoyées en flux Arrow IPC
+    
+    Le corps (application/vnd.apache.arrow.stream) est décodé directement en colonnes,
+    sans validation pydantic enregistrement par enregistrement.
+    """
+    try:
+        body = await request.body()
+        df = arrow_stream_to_dataframe(body)
+    except RuntimeError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Flux Arrow invalide: {str(e)}")
+    
+    try:
+        result = await correlation_service.analyze_correlations(
+            data=df,
+            variables=variables,
+            method=correlation_method,
+            significance_threshold=significance_threshold,
+            min_correlation_strength=min_correlation_strength
+        )
+        
+        if correlation_service.should_flush_history():
+            background_tasks.add_task(correlation_service.flush_history)
+        
         return CorrelationAnalysisResponse(
             analysis_id=result["analysis_id"],
             correlation_matrix=result["correlation_matrix"],
@@ -294,4 +371,4 @@ async def predict_failure(
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8004)
+    uvicorn.run(app, host="0.0.0.0", port=8004, loop="uvloop", http="httptools")
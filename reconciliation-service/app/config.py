@@ -2,8 +2,11 @@
 Configuration du service de réconciliation
 """
 
+from functools import lru_cache
+from types import MappingProxyType
+from pydantic import Field
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Mapping, Optional, Tuple
 
 class Settings(BaseSettings):
     """Configuration du service de réconciliation"""
@@ -25,22 +28,32 @@ class Settings(BaseSettings):
     max_batch_size: int = 10000
     
     # Configuration du matching
-    matching_algorithm: str = "fuzzy"
-    similarity_fields_weight: Dict[str, float] = {
-        "name": 0.4,
-        "email": 0.3,
-        "phone": 0.2,
-        "address": 0.1
-    }
+    matching_algorithm: str = "fuzzy"  # "fuzzy" (rapidfuzz), "tfidf" (cosinus creux, opt-in) ou "jaccard" (jetons)
+    similarity_fields_weight: Mapping[str, float] = Field(
+        default_factory=lambda: MappingProxyType({
+            "name": 0.4,
+            "email": 0.3,
+            "phone": 0.2,
+            "address": 0.1
+        })
+    )
     
     # Configuration de la fusion
-    merge_strategies: List[str] = ["latest_wins", "first_wins", "concatenate"]
+    merge_strategies: Tuple[str, ...] = ("latest_wins", "first_wins", "concatenate")
     default_merge_strategy: str = "latest_wins"
     
     # Configuration de performance
     max_concurrent_matches: int = 1000
     similarity_cache_size: int = 10000
     batch_processing_size: int = 500
+    candidate_batch_size: int = 50000
+    polars_blocking_min_rows: int = 20000  # blocking par jointure Polars paresseuse (si installé)
+    ann_neighbors: int = 20
+    ann_dimensions: int = 128
+    vectorizer_cache_size: int = 8  # matrices TF-IDF des charges identiques récentes (pas un cache de vocabulaire)
+    minhash_num_perm: int = 64
+    minhash_bands: int = 16  # 16 bandes de 4: candidates dès un Jaccard des 3-grammes ≈ 0.5
+    max_history_size: int = 10000
     
     # Configuration de logging
     log_level: str = "INFO"
@@ -48,11 +61,20 @@ class Settings(BaseSettings):
     
     # Configuration de monitoring
     metrics_enabled: bool = True
+    system_metrics_ttl: float = 1.0  # secondes
     health_check_interval: int = 30
     
     class Config:
         env_file = ".env"
         case_sensitive = False
 
-# Instance globale des paramètres
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Instance unique des paramètres, créée au premier accès (.env lu une seule fois)"""
+    return Settings()
+
+def __getattr__(name: str):
+    """Accès paresseux à l'instance globale: `from config import settings`"""
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -100,6 +100,37 @@ async def reconcile_data(request: ReconciliationRequest, background_tasks: Backg
         logger.error(f"Erreur lors de la réconciliation: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/reconcile/batch", response_model=List[ReconciliationResponse])
+async def reconcile_data_batch(requests: List[ReconciliationRequest]):
+    """
+    Réconciliation d'un lot de requêtes avec une vectorisation mutualisée
+    """
+    try:
+        logger.info(f"Début de la réconciliation groupée de {len(requests)} requêtes")
+        
+        results = await zingg_client.reconcile_entities_batch(
+            [request.model_dump() for request in requests]
+        )
+        
+        return [
+            ReconciliationResponse(
+                reconciliation_id=result["reconciliation_id"],
+                status="completed",
+                original_records=result["original_records"],
+                deduplicated_records=result["deduplicated_records"],
+                matched_pairs=result["matched_pairs"],
+                merged_records=result["merged_records"],
+                confidence_scores=result["confidence_scores"],
+                execution_time=result["execution_time"],
+                timestamp=datetime.now()
+            )
+            for result in results
+        ]
+        
+    except Exception as e:
+        logger.error(f"Erreur lors de la réconciliation groupée: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/match")
 async def match_entities(
     data: List[Dict[str, Any]], 
@@ -5,66 +5,159 @@ Client Zingg pour la réconciliation et le matching d'entités
 import pandas as pd
 import numpy as np
 import asyncio
+import hashlib
 import logging
+import threading
 import uuid
 import time
-from typing import Dict, List, Any, Optional, Tuple
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Deque, Dict, List, Any, Optional, Tuple, Union
 from datetime import datetime
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.feature_extraction.text import TfidfVectorizer
-from fuzzywuzzy import fuzz, process
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.base import clone
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.neighbors import NearestNeighbors
+from sklearn.preprocessing import normalize
+from rapidfuzz import fuzz, process
 import psutil
 
+from config import settings
+
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    pl = None
+    POLARS_AVAILABLE = False
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    faiss = None
+    FAISS_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Permutations MinHash: h(x) = (a * x + b) mod p, graine fixe pour des signatures reproductibles
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MINHASH_SEED = 1
+
+# Codes Soundex des consonnes (les voyelles et h, w, y n'ont pas de code)
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6"
+}
+
+def _soundex(value: str) -> str:
+    """Code Soundex (lettre + 3 chiffres) d'une chaîne; chaîne vide si aucune lettre"""
+    letters = [char for char in value.lower() if "a" <= char <= "z"]
+    if not letters:
+        return ""
+    
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0], "")
+    for char in letters[1:]:
+        digit = _SOUNDEX_CODES.get(char, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h et w ne séparent pas deux consonnes de même code
+        if char not in "hw":
+            previous = digit
+    
+    return code.ljust(4, "0")
+
 class ZinggClient:
     """Client pour les opérations Zingg"""
     
     def __init__(self):
-        self.reconciliation_history = []
+        # Historique borné (les plus anciennes entrées sont évincées) et index par identifiant
+        self.reconciliation_history: Deque[Dict[str, Any]] = deque(maxlen=settings.max_history_size)
+        self._history_index: Dict[str, Dict[str, Any]] = {}
+        self._total_reconciliations = 0
         self.start_time = datetime.now()
-        self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
+        self._system_metrics: Optional[Dict[str, float]] = None
+        self._system_metrics_ts = 0.0
+        # N-grammes de caractères: robustes aux fautes de frappe sur les noms, emails, adresses
+        self.vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 3), dtype=np.float32)
+        # Matrices TF-IDF par (champs, empreinte des textes), réutilisées pour des textes identiques (LRU)
+        self._tfidf_cache: "OrderedDict[Tuple[Tuple[str, ...], str], Any]" = OrderedDict()
+        # Les réconciliations s'exécutent dans des threads: cache et historique partagés
+        self._lock = threading.Lock()
     
     async def reconcile_entities(
         self,
-        data: List[Dict],
+        data: Union[List[Dict], pd.DataFrame],
         matching_config: Dict[str, Any],
         entity_type: str,
         threshold: float = 0.8,
         deduplication: bool = True,
         merge_strategy: str = "latest_wins"
     ) -> Dict[str, Any]:
-        """Réconcilie et fusionne les entités"""
+        """Réconcilie et fusionne les entités (calcul hors de la boucle d'événements)"""
+        return await asyncio.to_thread(
+            self._reconcile_sync,
+            data, matching_config, entity_type, threshold, deduplication, merge_strategy
+        )
+    
+    def _reconcile_sync(
+        self,
+        data: Union[List[Dict], pd.DataFrame],
+        matching_config: Dict[str, Any],
+        entity_type: str,
+        threshold: float,
+        deduplication: bool,
+        merge_strategy: str,
+        vectorizers: Optional[Dict[Tuple[str, ...], TfidfVectorizer]] = None
+    ) -> Dict[str, Any]:
+        """
+        Déduplication, matching et fusion; exécuté dans un thread (pandas/NumPy libèrent le GIL).
+        
+        vectorizers: vectoriseurs TF-IDF déjà ajustés par champs (lot), propres à cet appel.
+        """
         
         start_time = time.time()
         reconciliation_id = str(uuid.uuid4())
         
         try:
-            df = pd.DataFrame(data)
+            df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
             original_records = len(df)
             
             # Étape 1: Déduplication si demandée
             if deduplication:
-                df = await self._deduplicate_dataframe(df, matching_config)
+                df = self._deduplicate_dataframe(
+                    df, matching_config, vectorizers
+                )
             
             deduplicated_records = len(df)
             
             # Étape 2: Matching des entités
-            matches = await self._find_entity_matches(df, matching_config, threshold)
+            matches = self._find_entity_matches(
+                df, matching_config, threshold, vectorizers
+            )
             matched_pairs = len(matches)
             
             # Étape 3: Fusion des entités matchées
-            merged_records = await self._merge_matched_entities(
+            merged_records = self._merge_matched_entities(
                 df, matches, merge_strategy
             )
             
             # Calcul des scores de confiance
-            confidence_scores = await self._calculate_confidence_scores(matches)
+            confidence_scores = self._calculate_confidence_scores(matches)
             
             execution_time = time.time() - start_time
             
             # Enregistrement dans l'historique
-            self.reconciliation_history.append({
+            self._record_history({
                 "reconciliation_id": reconciliation_id,
                 "entity_type": entity_type,
                 "original_records": original_records,
@@ -89,10 +182,78 @@ class ZinggClient:
             logger.error(f"Erreur lors de la réconciliation {reconciliation_id}: {str(e)}")
             raise e
     
-    async def _deduplicate_dataframe(
+    async def reconcile_entities_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Réconcilie un lot de requêtes en mutualisant la vectorisation TF-IDF.
+        
+        Les requêtes sont regroupées par (type d'entité, champs): un seul vectoriseur est
+        ajusté sur les textes distincts du groupe puis réutilisé (transform) par chaque requête.
+        Ces vectoriseurs restent propres au lot (le cache partagé n'est pas modifié).
+        """
+        frames, vectorizers = await asyncio.to_thread(self._prefit_vectorizers, requests)
+        
+        results = []
+        for request, df, request_vectorizers in zip(requests, frames, vectorizers):
+            results.append(await asyncio.to_thread(
+                self._reconcile_sync,
+                df,
+                request["matching_config"],
+                request.get("entity_type", "customer"),
+                request.get("threshold", 0.8),
+                request.get("deduplication", True),
+                request.get("merge_strategy", "latest_wins"),
+                request_vectorizers
+            ))
+        
+        return results
+    
+    def _prefit_vectorizers(
+        self,
+        requests: List[Dict[str, Any]]
+    ) -> Tuple[List[pd.DataFrame], List[Dict[Tuple[str, ...], TfidfVectorizer]]]:
+        """
+        DataFrames du lot et, pour chaque requête, ses vectoriseurs par champs: un seul
+        vectoriseur est ajusté par (type d'entité, champs) et partagé par les requêtes du groupe.
+        """
+        frames = [pd.DataFrame(request["data"]) for request in requests]
+        vectorizers: List[Dict[Tuple[str, ...], TfidfVectorizer]] = [{} for _ in requests]
+        
+        group_texts: Dict[Tuple[str, Tuple[str, ...]], List[pd.Series]] = {}
+        group_requests: Dict[Tuple[str, Tuple[str, ...]], List[int]] = {}
+        for position, (request, df) in enumerate(zip(requests, frames)):
+            config = request["matching_config"]
+            if self._matching_algorithm(config) != "tfidf":
+                continue
+            
+            entity_type = request.get("entity_type", "customer")
+            field_sets = [config.get("matching_fields", [])]
+            if request.get("deduplication", True):
+                field_sets.append(config.get("similarity_fields", []))
+            
+            for fields in field_sets:
+                texts = self._match_texts(df, fields)
+                if texts is not None:
+                    key = (entity_type, tuple(fields))
+                    group_texts.setdefault(key, []).append(texts)
+                    group_requests.setdefault(key, []).append(position)
+        
+        for key, texts in group_texts.items():
+            vectorizer = clone(self.vectorizer)
+            try:
+                vectorizer.fit(pd.concat(texts, ignore_index=True).unique())
+            except ValueError:
+                # Vocabulaire vide: chaque requête retombe sur son propre ajustement
+                continue
+            for position in group_requests[key]:
+                vectorizers[position][key[1]] = vectorizer
+        
+        return frames, vectorizers
+    
+    def _deduplicate_dataframe(
         self, 
         df: pd.DataFrame, 
-        config: Dict[str, Any]
+        config: Dict[str, Any],
+        vectorizers: Optional[Dict[Tuple[str, ...], TfidfVectorizer]] = None
     ) -> pd.DataFrame:
         """Supprime les doublons exacts et similaires"""
         
@@ -104,33 +265,20 @@ class ZinggClient:
         threshold = config.get("similarity_threshold", 0.9)
         
         if similarity_fields:
-            # Utilisation de l'algorithme de Levenshtein pour les chaînes
-            to_remove = set()
-            
-            for i in range(len(df)):
-                if i in to_remove:
-                    continue
-                    
-                for j in range(i + 1, len(df)):
-                    if j in to_remove:
-                        continue
-                    
-                    similarity_score = await self._calculate_record_similarity(
-                        df.iloc[i], df.iloc[j], similarity_fields
-                    )
-                    
-                    if similarity_score >= threshold:
-                        to_remove.add(j)
-            
-            df = df.drop(df.index[list(to_remove)])
+            # Paires calculées en bloc (cosinus creux, Jaccard ou rapidfuzz cdist selon l'algorithme)
+            first, second, _ = self._similar_pairs(
+                df, similarity_fields, threshold, config, self._candidate_pairs(df, config), vectorizers
+            )
+            df = df[self._greedy_keep_mask(len(df), first, second)]
         
         return df
     
-    async def _find_entity_matches(
+    def _find_entity_matches(
         self,
         df: pd.DataFrame,
         config: Dict[str, Any],
-        threshold: float
+        threshold: float,
+        vectorizers: Optional[Dict[Tuple[str, ...], TfidfVectorizer]] = None
     ) -> List[Dict[str, Any]]:
         """Trouve les correspondances entre entités"""
         
@@ -140,142 +288,735 @@ class ZinggClient:
         if not matching_fields:
             return matches
         
-        # Parcours des paires d'entités
-        for i in range(len(df)):
-            for j in range(i + 1, len(df)):
-                similarity_score = await self._calculate_record_similarity(
-                    df.iloc[i], df.iloc[j], matching_fields
-                )
-                
-                if similarity_score >= threshold:
-                    matches.append({
-                        "entity_1_index": i,
-                        "entity_2_index": j,
-                        "entity_1_id": df.iloc[i].get("id", str(i)),
-                        "entity_2_id": df.iloc[j].get("id", str(j)),
-                        "similarity_score": similarity_score,
-                        "matching_fields": matching_fields
-                    })
+        first, second, scores = self._similar_pairs(
+            df, matching_fields, threshold, config, self._candidate_pairs(df, config),
+            vectorizers
+        )
+        
+        ids = df["id"].tolist() if "id" in df.columns else None
+        for i, j, similarity_score in zip(first.tolist(), second.tolist(), scores.tolist()):
+            matches.append({
+                "entity_1_index": i,
+                "entity_2_index": j,
+                "entity_1_id": ids[i] if ids is not None else str(i),
+                "entity_2_id": ids[j] if ids is not None else str(j),
+                "similarity_score": similarity_score,
+                "matching_fields": matching_fields
+            })
         
         return matches
     
-    async def _calculate_record_similarity(
+    def _matching_algorithm(self, config: Dict[str, Any]) -> str:
+        """Algorithme de similarité: "tfidf" (cosinus), "jaccard" (jetons) ou "fuzzy" (Levenshtein)"""
+        return config.get("matching_algorithm", settings.matching_algorithm)
+    
+    def _similar_pairs(
         self,
-        record1: pd.Series,
-        record2: pd.Series,
-        fields: List[str]
-    ) -> float:
-        """Calcule la similarité entre deux enregistrements"""
+        df: pd.DataFrame,
+        fields: List[str],
+        threshold: float,
+        config: Dict[str, Any],
+        candidates: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        vectorizers: Optional[Dict[Tuple[str, ...], TfidfVectorizer]] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Paires (i < j, triées) dont la similarité atteint le seuil, selon l'algorithme configuré.
         
-        similarities = []
+        Les champs de config["exact_match_fields"] (identifiants comme l'email) court-circuitent
+        le calcul: des valeurs normalisées identiques donnent directement une paire de score 1.0,
+        et seul le premier enregistrement de chaque groupe reste soumis au calcul de similarité.
+        """
+        exact_fields = [field for field in config.get("exact_match_fields", []) if field in df.columns]
+        if not exact_fields:
+            return self._scored_pairs(df, fields, threshold, config, candidates, vectorizers)
+        
+        n = len(df)
+        exact_codes, scored = self._exact_pairs(df, exact_fields)
+        
+        positions = np.flatnonzero(scored)
+        if candidates is not None:
+            # Renumérotation monotone: les paires candidates restent triées
+            remap = np.cumsum(scored) - 1
+            kept = scored[candidates[0]] & scored[candidates[1]]
+            candidates = (remap[candidates[0][kept]], remap[candidates[1][kept]])
+        
+        first, second, scores = self._scored_pairs(
+            df[scored], fields, threshold, config, candidates, vectorizers
+        )
+        
+        codes = np.concatenate([exact_codes, positions[first] * n + positions[second]])
+        scores = np.concatenate([np.ones(len(exact_codes)), scores])
+        order = np.argsort(codes, kind="stable")
+        return codes[order] // n, codes[order] % n, scores[order]
+    
+    def _exact_pairs(self, df: pd.DataFrame, fields: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Paires (i < j, encodées i * n + j) de valeurs normalisées identiques sur l'un des champs,
+        et masque des lignes restant à comparer (premier enregistrement de chaque groupe).
+        """
+        n = len(df)
+        scored = np.ones(n, dtype=bool)
+        encoded = []
         
         for field in fields:
-            if field in record1 and field in record2:
-                val1 = str(record1[field]).strip().lower()
-                val2 = str(record2[field]).strip().lower()
-                
-                if val1 and val2:
-                    # Similarité de chaînes avec fuzzy matching
-                    similarity = fuzz.ratio(val1, val2) / 100.0
-                    similarities.append(similarity)
-        
-        if similarities:
-            return np.mean(similarities)
+            values = df[field].fillna("").astype(str).str.strip().str.lower()
+            # Les valeurs vides ne sont pas des identifiants
+            values = values.where(values != "")
+            for rows in values.reset_index(drop=True).groupby(values.to_numpy()).indices.values():
+                if len(rows) < 2:
+                    continue
+                a, b = np.triu_indices(len(rows), k=1)
+                encoded.append(rows[a].astype(np.int64) * n + rows[b])
+                scored[rows[1:]] = False
+        
+        if not encoded:
+            return np.empty(0, dtype=np.int64), scored
+        
+        return np.unique(np.concatenate(encoded)), scored
+    
+    def _scored_pairs(
+        self,
+        df: pd.DataFrame,
+        fields: List[str],
+        threshold: float,
+        config: Dict[str, Any],
+        candidates: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        vectorizers: Optional[Dict[Tuple[str, ...], TfidfVectorizer]] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Paires (i < j, triées) dont la similarité calculée atteint le seuil"""
+        algorithm = self._matching_algorithm(config)
+        
+        if algorithm == "tfidf":
+            return self._tfidf_similar_pairs(
+                df, fields, threshold, candidates, config, vectorizers
+            )
+        if algorithm == "jaccard":
+            return self._jaccard_similar_pairs(df, fields, threshold, candidates)
+        return self._fuzzy_similar_pairs(df, fields, threshold, candidates)
+    
+    def _greedy_keep_mask(self, n: int, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+        """
+        Masque des lignes conservées: chaque ligne encore conservée élimine ses doublons j > i.
+        
+        Les paires étant triées par (i, j), la boucle porte sur les lignes distinctes (au plus n)
+        et non sur les paires; les doublons d'une ligne sont masqués en une affectation.
+        """
+        keep = np.ones(n, dtype=bool)
+        if len(first) == 0:
+            return keep
+        
+        starts = np.flatnonzero(np.r_[True, first[1:] != first[:-1]])
+        for i, duplicates in zip(first[starts].tolist(), np.split(second, starts[1:])):
+            if keep[i]:
+                keep[duplicates] = False
+        
+        return keep
+    
+    def _match_texts(self, df: pd.DataFrame, fields: List[str]) -> Optional[pd.Series]:
+        """Texte normalisé par enregistrement: concaténation des champs présents"""
+        fields = [field for field in fields if field in df.columns]
+        if not fields or len(df) < 2:
+            return None
+        
+        return df[fields].fillna("").astype(str).agg(" ".join, axis=1).str.strip().str.lower()
+    
+    def _tfidf_similar_pairs(
+        self,
+        df: pd.DataFrame,
+        fields: List[str],
+        threshold: float,
+        candidates: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        config: Optional[Dict[str, Any]] = None,
+        vectorizers: Optional[Dict[Tuple[str, ...], TfidfVectorizer]] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Paires (i < j) dont la similarité cosinus TF-IDF atteint le seuil.
+        
+        Les champs sont concaténés par enregistrement; le produit creux M @ M.T est
+        calculé par blocs de lignes pour borner la mémoire de la matrice de scores.
+        Avec des paires candidates (blocking ou voisins approchés si config["ann"]),
+        seuls leurs produits scalaires sont calculés.
+        Le vocabulaire est ajusté sur les textes de l'appel (ou du lot): le résultat ne dépend
+        pas des requêtes précédentes.
+        """
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0))
+        
+        texts = self._match_texts(df, fields)
+        if texts is None:
+            return empty
+        
+        try:
+            # CSR float32 aux lignes normalisées L2 par TfidfVectorizer: le produit scalaire
+            # est directement le cosinus, sans normalisation supplémentaire
+            M = self._tfidf_matrix(texts, fields, vectorizers).tocsr()
+        except ValueError:
+            # Vocabulaire vide (tous les champs vides)
+            return empty
+        
+        ann_config = config.get("ann") if config else None
+        if candidates is None and ann_config:
+            candidates = self._ann_candidates(M, int(ann_config.get("k", settings.ann_neighbors)))
+        
+        if candidates is not None:
+            return self._score_candidate_pairs(M, candidates, threshold)
+        
+        # Produit CSR @ CSR en float32: moitié moins d'octets lus que le float64 par défaut
+        MT = M.T.tocsr()
+        first, second, scores = [], [], []
+        block_size = settings.batch_processing_size
+        for start in range(0, M.shape[0], block_size):
+            S = (M[start:start + block_size] @ MT).tocoo()
+            rows = S.row + start
+            # Tolérance sur l'arrondi float32 du cosinus de deux textes identiques
+            keep = (S.col > rows) & (S.data >= threshold - 1e-6)
+            first.append(rows[keep])
+            second.append(S.col[keep])
+            scores.append(np.minimum(S.data[keep], 1.0))
+        
+        first = np.concatenate(first).astype(np.int64)
+        second = np.concatenate(second).astype(np.int64)
+        scores = np.concatenate(scores)
+        
+        # Même ordre que le parcours (i, j) de la boucle de référence
+        order = np.lexsort((second, first))
+        return first[order], second[order], scores[order]
+    
+    def _tfidf_matrix(
+        self,
+        texts: pd.Series,
+        fields: List[str],
+        vectorizers: Optional[Dict[Tuple[str, ...], TfidfVectorizer]] = None
+    ) -> Any:
+        """
+        Matrice TF-IDF float32 ajustée sur les textes de l'appel.
+        
+        Le cache ne sert qu'aux charges identiques: il est indexé par le contenu des textes
+        (même requête rejouée, déduplication puis matching sur les mêmes champs). Ce n'est pas
+        un cache de vocabulaire: tout autre jeu de textes paie un nouvel ajustement, ce qui
+        évite les n-grammes hors vocabulaire. Il reste donc petit (vectorizer_cache_size).
+        """
+        if vectorizers and tuple(fields) in vectorizers:
+            # Vectoriseur du lot, ajusté sur des textes qui incluent ceux de l'appel
+            return vectorizers[tuple(fields)].transform(texts)
+        
+        digest = hashlib.blake2b(
+            pd.util.hash_pandas_object(texts, index=False).to_numpy().tobytes(), digest_size=16
+        ).hexdigest()
+        key = (tuple(fields), digest)
+        with self._lock:
+            M = self._tfidf_cache.get(key)
+            if M is not None:
+                self._tfidf_cache.move_to_end(key)
+        if M is not None:
+            return M
+        
+        M = clone(self.vectorizer).fit_transform(texts).tocsr()
+        with self._lock:
+            self._tfidf_cache[key] = M
+            while len(self._tfidf_cache) > settings.vectorizer_cache_size:
+                self._tfidf_cache.popitem(last=False)
+        return M
+    
+    def _jaccard_similar_pairs(
+        self,
+        df: pd.DataFrame,
+        fields: List[str],
+        threshold: float,
+        candidates: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Paires (i < j) dont l'indice de Jaccard des ensembles de jetons atteint le seuil.
+        
+        Chaque jeton est encodé une seule fois dans une matrice d'incidence binaire creuse B;
+        les intersections |A ∩ B| de toutes les paires sont données par B @ B.T (par blocs),
+        sans boucle Python sur les paires.
+        """
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0))
+        
+        texts = self._match_texts(df, fields)
+        if texts is None:
+            return empty
+        
+        try:
+            B = CountVectorizer(binary=True, token_pattern=r"(?u)\b\w+\b", dtype=np.int32).fit_transform(texts)
+        except ValueError:
+            # Aucun jeton
+            return empty
+        
+        sizes = np.asarray(B.sum(axis=1)).ravel()
+        
+        if candidates is not None:
+            first, second = candidates
+            intersections = self._rowwise_dot(B, first, second)
+            unions = sizes[first] + sizes[second] - intersections
+            with np.errstate(invalid="ignore", divide="ignore"):
+                scores = np.where(unions > 0, intersections / unions, 0.0)
+            keep = scores >= threshold
+            return first[keep], second[keep], scores[keep]
+        
+        BT = B.T.tocsr()
+        first, second, scores = [], [], []
+        block_size = settings.batch_processing_size
+        for start in range(0, B.shape[0], block_size):
+            I = (B[start:start + block_size] @ BT).tocoo()
+            rows = I.row + start
+            block_scores = I.data / (sizes[rows] + sizes[I.col] - I.data)
+            keep = (I.col > rows) & (block_scores >= threshold)
+            first.append(rows[keep])
+            second.append(I.col[keep])
+            scores.append(block_scores[keep])
+        
+        first = np.concatenate(first).astype(np.int64)
+        second = np.concatenate(second).astype(np.int64)
+        scores = np.concatenate(scores)
+        
+        order = np.lexsort((second, first))
+        return first[order], second[order], scores[order]
+    
+    def _ann_candidates(self, M: Any, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Paires candidates (i < j) issues des k plus proches voisins de chaque ligne.
+        
+        Avec FAISS, les vecteurs TF-IDF sont réduits par SVD tronquée puis indexés en HNSW
+        (produit scalaire); sinon recherche exacte creuse de scikit-learn (cosinus).
+        Les scores définitifs sont recalculés ensuite sur les vecteurs TF-IDF complets.
+        """
+        n = M.shape[0]
+        k = min(k + 1, n)  # chaque ligne est sa propre plus proche voisine
+        
+        if FAISS_AVAILABLE:
+            n_components = min(settings.ann_dimensions, M.shape[1] - 1, n - 1)
+            if n_components >= 1:
+                vectors = TruncatedSVD(n_components=n_components, random_state=0).fit_transform(M)
+            else:
+                vectors = M.toarray()
+            vectors = np.ascontiguousarray(normalize(vectors), dtype=np.float32)
+            
+            index = faiss.IndexHNSWFlat(vectors.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+            index.add(vectors)
+            _, neighbors = index.search(vectors, k)
         else:
-            return 0.0
+            neighbors = NearestNeighbors(n_neighbors=k, metric="cosine", algorithm="brute").fit(M).kneighbors(
+                M, return_distance=False
+            )
+        
+        rows = np.repeat(np.arange(n, dtype=np.int64), neighbors.shape[1])
+        cols = neighbors.ravel().astype(np.int64)
+        valid = (cols >= 0) & (cols != rows)
+        
+        # Paires non orientées, dédoublonnées et triées par (i, j)
+        first = np.minimum(rows[valid], cols[valid])
+        second = np.maximum(rows[valid], cols[valid])
+        pair_codes = np.unique(first * n + second)
+        return pair_codes // n, pair_codes % n
+    
+    def _score_candidate_pairs(
+        self,
+        M: Any,
+        candidates: Tuple[np.ndarray, np.ndarray],
+        threshold: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Cosinus des seules paires candidates (produit scalaire ligne à ligne, par lots)"""
+        first, second = candidates
+        scores = self._rowwise_dot(M, first, second)
+        
+        keep = scores >= threshold - 1e-6
+        return first[keep], second[keep], np.minimum(scores[keep], 1.0)
+    
+    def _rowwise_dot(self, M: Any, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+        """Produits scalaires M[first[k]] . M[second[k]] (matrice creuse), par lots de paires"""
+        # float32 pour les vecteurs TF-IDF, float64 pour les comptes entiers (Jaccard)
+        products = np.empty(len(first), dtype=np.result_type(M.dtype, np.float32))
+        
+        batch_size = settings.candidate_batch_size
+        for start in range(0, len(first), batch_size):
+            stop = start + batch_size
+            rows = M[first[start:stop]].multiply(M[second[start:stop]])
+            products[start:stop] = np.asarray(rows.sum(axis=1)).ravel()
+        
+        return products
     
-    async def _merge_matched_entities(
+    def _fuzzy_similar_pairs(
         self,
         df: pd.DataFrame,
-        matches: List[Dict[str, Any]],
-        merge_strategy: str
-    ) -> List[Dict[str, Any]]:
-        """Fusionne les entités matchées"""
+        fields: List[str],
+        threshold: float,
+        candidates: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Paires (i < j) dont la similarité fuzzy moyenne atteint le seuil.
         
-        merged_records = []
-        processed_indices = set()
+        Les ratios sont calculés en C par rapidfuzz: matrice par blocs de lignes (cdist)
+        pour toutes les paires, ou élément par élément (cpdist) pour des paires candidates.
+        Le score d'une paire est la moyenne sur les champs renseignés des deux côtés.
+        """
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0))
         
-        for match in matches:
-            idx1 = match["entity_1_index"]
-            idx2 = match["entity_2_index"]
+        n = len(df)
+        columns = list(self._field_arrays(df, fields).values())
+        if not columns or n < 2:
+            return empty
+        present = [column.astype(bool) for column in columns]
+        
+        if candidates is not None:
+            first, second = candidates
+            total = np.zeros(len(first))
+            counts = np.zeros(len(first))
+            for column, mask in zip(columns, present):
+                valid = mask[first] & mask[second]
+                ratios = process.cpdist(
+                    column[first], column[second], scorer=fuzz.ratio, dtype=np.float64, workers=-1
+                )
+                total += np.where(valid, ratios / 100.0, 0.0)
+                counts += valid
+            
+            with np.errstate(invalid="ignore", divide="ignore"):
+                scores = np.where(counts > 0, total / counts, 0.0)
+            keep = scores >= threshold
+            return first[keep], second[keep], scores[keep]
+        
+        first, second, pair_scores = [], [], []
+        block_size = settings.batch_processing_size
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            total = np.zeros((stop - start, n))
+            counts = np.zeros((stop - start, n))
+            for column, mask in zip(columns, present):
+                valid = np.outer(mask[start:stop], mask)
+                ratios = process.cdist(
+                    column[start:stop], column, scorer=fuzz.ratio, dtype=np.float64, workers=-1
+                )
+                total += np.where(valid, ratios / 100.0, 0.0)
+                counts += valid
             
-            if idx1 in processed_indices or idx2 in processed_indices:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                scores = np.where(counts > 0, total / counts, 0.0)
+            # Triangle supérieur strict uniquement (j > i)
+            rows, cols = np.nonzero(
+                (scores >= threshold) & (np.arange(n) > np.arange(start, stop)[:, np.newaxis])
+            )
+            first.append(rows + start)
+            second.append(cols)
+            pair_scores.append(scores[rows, cols])
+        
+        return (
+            np.concatenate(first).astype(np.int64),
+            np.concatenate(second).astype(np.int64),
+            np.concatenate(pair_scores)
+        )
+    
+    def _candidate_pairs(
+        self,
+        df: pd.DataFrame,
+        config: Dict[str, Any]
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Paires candidates (i < j) partageant au moins une clé de blocking, triées par (i, j).
+        
+        config["blocking"] liste les bloqueurs, par exemple
+        [{"field": "email", "key": "domain"}, {"field": "name", "key": "prefix3"}].
+        Pour les champs longs (adresses), {"field": "address", "key": "minhash", "bands": 16}
+        regroupe par LSH les valeurs dont le Jaccard des 3-grammes est probablement élevé.
+        Retourne None si aucun blocking n'est configuré (toutes les paires sont comparées).
+        """
+        blockers = config.get("blocking")
+        if not blockers:
+            return None
+        
+        n = len(df)
+        if POLARS_AVAILABLE and n >= settings.polars_blocking_min_rows:
+            pair_codes = self._polars_block_pair_codes(df, blockers)
+            return pair_codes // n, pair_codes % n
+        
+        encoded = []
+        for block_rows in self._generate_block_keys(df, blockers).values():
+            if len(block_rows) < 2:
+                continue
+            a, b = np.triu_indices(len(block_rows), k=1)
+            encoded.append(block_rows[a] * n + block_rows[b])
+        
+        if not encoded:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        
+        # Union des paires de tous les bloqueurs; l'encodage i * n + j trie par (i, j)
+        pair_codes = np.unique(np.concatenate(encoded))
+        return pair_codes // n, pair_codes % n
+    
+    def _polars_block_pair_codes(self, df: pd.DataFrame, blockers: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Codes i * n + j (triés, uniques) des paires partageant une clé de blocking.
+        
+        Les clés (bloqueur, clé, ligne) de tous les bloqueurs forment une seule table jointe
+        à elle-même dans un plan Polars paresseux: dérivation des clés, jointure, filtre i < j
+        et dédoublonnage s'exécutent en une passe multithread (moteur streaming), sans boucle
+        Python par bloc. Les bloqueurs MinHash restent calculés par _minhash_blocks.
+        """
+        n = len(df)
+        key_frames = []
+        encoded = []
+        
+        for blocker_idx, blocker in enumerate(blockers):
+            field = blocker.get("field")
+            if field not in df.columns:
                 continue
             
-            record1 = df.iloc[idx1].to_dict()
-            record2 = df.iloc[idx2].to_dict()
+            values = df[field].fillna("").astype(str).str.strip().str.lower()
+            key_type = blocker.get("key", "exact")
             
-            # Fusion selon la stratégie
-            if merge_strategy == "latest_wins":
-                merged_record = await self._merge_latest_wins(record1, record2)
-            elif merge_strategy == "first_wins":
-                merged_record = await self._merge_first_wins(record1, record2)
-            elif merge_strategy == "concatenate":
-                merged_record = await self._merge_concatenate(record1, record2)
-            else:
-                merged_record = record1  # Par défaut
+            if key_type == "minhash":
+                for block_rows in self._minhash_blocks(blocker_idx, values, blocker).values():
+                    a, b = np.triu_indices(len(block_rows), k=1)
+                    encoded.append(block_rows[a] * n + block_rows[b])
+                continue
             
-            merged_record["_merged_from"] = [record1.get("id"), record2.get("id")]
-            merged_record["_similarity_score"] = match["similarity_score"]
+            if key_type == "domain":
+                key = pl.col("value").str.split("@").list.last()
+            elif key_type.startswith("prefix"):
+                key = pl.col("value").str.slice(0, int(key_type[len("prefix"):] or 3))
+            elif key_type == "soundex":
+                values = values.map(_soundex)
+                key = pl.col("value")
+            else:
+                key = pl.col("value")
             
-            merged_records.append(merged_record)
-            processed_indices.update([idx1, idx2])
+            key_frames.append(
+                pl.LazyFrame({"value": values.tolist()}, schema={"value": pl.String})
+                .with_row_index("row")
+                .select(pl.lit(blocker_idx).alias("blocker"), key.alias("key"), pl.col("row").cast(pl.Int64))
+                # Les valeurs vides ne forment pas de bloc
+                .filter(pl.col("key") != "")
+            )
         
-        # Ajout des enregistrements non matchés
-        for i, row in df.iterrows():
-            if i not in processed_indices:
-                merged_records.append(row.to_dict())
-        
-        return merged_records
-    
-    async def _merge_latest_wins(self, record1: Dict, record2: Dict) -> Dict:
-        """Stratégie de fusion: le plus récent gagne"""
-        # Pour la démo, on suppose que record2 est plus récent
-        merged = record1.copy()
-        for key, value in record2.items():
-            if value is not None and value != "":
-                merged[key] = value
-        return merged
-    
-    async def _merge_first_wins(self, record1: Dict, record2: Dict) -> Dict:
-        """Stratégie de fusion: le premier gagne"""
-        merged = record1.copy()
-        for key, value in record2.items():
-            if key not in merged or merged[key] is None or merged[key] == "":
-                merged[key] = value
-        return merged
-    
-    async def _merge_concatenate(self, record1: Dict, record2: Dict) -> Dict:
-        """Stratégie de fusion: concaténation"""
-        merged = {}
-        for key in set(record1.keys()) | set(record2.keys()):
-            val1 = record1.get(key, "")
-            val2 = record2.get(key, "")
+        if key_frames:
+            keys = pl.concat(key_frames)
+            pairs = (
+                keys.join(keys, on=["blocker", "key"], suffix="_other")
+                .filter(pl.col("row") < pl.col("row_other"))
+                .select((pl.col("row") * n + pl.col("row_other")).alias("code"))
+                .unique()
+            )
+            encoded.append(pairs.collect(engine="streaming")["code"].to_numpy())
+        
+        if not encoded:
+            return np.empty(0, dtype=np.int64)
+        
+        return np.unique(np.concatenate(encoded).astype(np.int64))
+    
+    def _generate_block_keys(
+        self,
+        df: pd.DataFrame,
+        blockers: List[Dict[str, str]]
+    ) -> Dict[Tuple[int, Any], np.ndarray]:
+        """Positions des lignes par clé de blocking (clé préfixée par le numéro du bloqueur)"""
+        blocks = {}
+        
+        for blocker_idx, blocker in enumerate(blockers):
+            field = blocker.get("field")
+            if field not in df.columns:
+                continue
+            
+            values = df[field].fillna("").astype(str).str.strip().str.lower()
+            key_type = blocker.get("key", "exact")
+            
+            if key_type == "minhash":
+                # Une clé par bande de signature: plusieurs blocs par ligne
+                blocks.update(self._minhash_blocks(blocker_idx, values, blocker))
+                continue
             
-            if val1 and val2:
-                merged[key] = f"{val1} | {val2}"
-            elif val1:
-                merged[key] = val1
+            if key_type == "domain":
+                keys = values.str.split("@").str[-1]
+            elif key_type.startswith("prefix"):
+                keys = values.str[:int(key_type[len("prefix"):] or 3)]
+            elif key_type == "soundex":
+                keys = values.map(_soundex)
             else:
-                merged[key] = val2
+                keys = values
+            
+            # Les valeurs vides ne forment pas de bloc
+            keys = keys.where(keys != "")
+            for key, rows in keys.reset_index(drop=True).groupby(keys.to_numpy()).indices.items():
+                blocks[(blocker_idx, key)] = rows.astype(np.int64)
+        
+        return blocks
+    
+    def _minhash_blocks(
+        self,
+        blocker_idx: int,
+        values: pd.Series,
+        blocker: Dict[str, Any]
+    ) -> Dict[Tuple[int, Any], np.ndarray]:
+        """
+        Blocs LSH: lignes dont une bande de la signature MinHash est identique.
+        
+        Avec b bandes de r = num_perm / b lignes, deux valeurs de Jaccard s deviennent
+        candidates avec une probabilité 1 - (1 - s^r)^b (seuil effectif ≈ (1/b)^(1/r)).
+        """
+        num_perm = settings.minhash_num_perm
+        bands = int(blocker.get("bands", settings.minhash_bands))
+        rows_per_band = max(num_perm // bands, 1)
+        
+        positions, signatures = self._minhash_signatures(values, num_perm)
+        blocks = {}
+        if len(positions) < 2:
+            return blocks
+        
+        for band in range(bands):
+            band_values = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+            if band_values.shape[1] == 0:
+                break
+            _, inverse = np.unique(band_values, axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+            # Tri stable: positions croissantes dans chaque bloc
+            order = np.argsort(inverse, kind="stable")
+            bounds = np.flatnonzero(np.diff(inverse[order])) + 1
+            for group, rows in enumerate(np.split(positions[order], bounds)):
+                if len(rows) > 1:
+                    blocks[(blocker_idx, ("minhash", band, group))] = rows
+        
+        return blocks
+    
+    def _minhash_signatures(self, values: pd.Series, num_perm: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Signatures MinHash des 3-grammes de caractères de chaque valeur non vide.
+        
+        Les 3-grammes sont encodés une fois par une matrice d'incidence creuse; le minimum
+        de chaque permutation est pris par segment de ligne (minimum.reduceat), par lots.
+        Retourne (positions des lignes signées, signatures uint64 de forme (lignes, num_perm)).
+        """
+        empty = (np.empty(0, dtype=np.int64), np.empty((0, num_perm), dtype=np.uint64))
+        try:
+            X = CountVectorizer(
+                analyzer="char", ngram_range=(3, 3), lowercase=False, binary=True
+            ).fit_transform(values)
+        except ValueError:
+            # Aucune valeur d'au moins 3 caractères
+            return empty
+        
+        X = X.tocsr()
+        positions = np.flatnonzero(np.diff(X.indptr))
+        if len(positions) == 0:
+            return empty
+        
+        rng = np.random.default_rng(_MINHASH_SEED)
+        a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        
+        shingles = X.indices.astype(np.uint64)
+        starts = X.indptr[positions]
+        ends = X.indptr[positions + 1]
+        signatures = np.empty((len(positions), num_perm), dtype=np.uint64)
+        block_size = settings.batch_processing_size
+        for start in range(0, len(positions), block_size):
+            stop = min(start + block_size, len(positions))
+            lo, hi = starts[start], ends[stop - 1]
+            # Le produit déborde volontairement (arithmétique modulo 2^64)
+            hashed = (np.outer(shingles[lo:hi], a) + b) % _MERSENNE_PRIME
+            signatures[start:stop] = np.minimum.reduceat(hashed, starts[start:stop] - lo, axis=0)
         
-        return merged
+        return positions.astype(np.int64), signatures
     
-    async def _calculate_confidence_scores(self, matches: List[Dict[str, Any]]) -> Dict[str, float]:
+    def _field_arrays(self, df: pd.DataFrame, fields: List[str]) -> Dict[str, np.ndarray]:
+        """Valeurs normalisées (strip + minuscules) des champs présents, calculées une fois par champ"""
+        return {
+            field: df[field].map(str).str.strip().str.lower().to_numpy()
+            for field in fields
+            if field in df.columns
+        }
+    
+    def _merge_matched_entities(
+        self,
+        df: pd.DataFrame,
+        matches: List[Dict[str, Any]],
+        merge_strategy: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Fusionne les entités matchées.
+        
+        Les matches forment un graphe dont les composantes connexes sont les groupes de doublons
+        (y compris au-delà de deux enregistrements); chaque groupe est fusionné colonne par
+        colonne par une seule agrégation groupby selon la stratégie.
+        """
+        df = df.reset_index(drop=True)
+        if not matches:
+            return df.to_dict('records')
+        
+        first = np.fromiter((match["entity_1_index"] for match in matches), dtype=np.int64, count=len(matches))
+        second = np.fromiter((match["entity_2_index"] for match in matches), dtype=np.int64, count=len(matches))
+        scores = np.fromiter((match["similarity_score"] for match in matches), dtype=np.float64, count=len(matches))
+        
+        n = len(df)
+        graph = coo_matrix((np.ones(len(matches)), (first, second)), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+        matched = np.bincount(labels)[labels] > 1
+        
+        members = df[matched]
+        groups = labels[matched]
+        
+        # Groupes dans l'ordre de leur premier enregistrement
+        merged = self._merge_groups(members, groups, merge_strategy)
+        ids = members["id"] if "id" in members.columns else pd.Series(None, index=members.index, dtype=object)
+        merged["_merged_from"] = ids.groupby(groups, sort=False).agg(list)
+        merged["_similarity_score"] = pd.Series(scores).groupby(labels[first]).mean()
+        
+        # Ajout des enregistrements non matchés
+        return merged.to_dict('records') + df[~matched].to_dict('records')
+    
+    def _merge_groups(self, members: pd.DataFrame, groups: np.ndarray, merge_strategy: str) -> pd.DataFrame:
+        """Un enregistrement fusionné par groupe (index: numéro de groupe), colonne par colonne"""
+        if merge_strategy not in ("latest_wins", "first_wins", "concatenate"):
+            # Par défaut: premier enregistrement du groupe
+            first_rows = ~pd.Series(groups).duplicated().to_numpy()
+            return members[first_rows].set_axis(groups[first_rows])
+        
+        # Valeurs vides (None, NaN, "") ignorées par la fusion
+        present = members.where(members.notna() & members.ne(""))
+        grouped = present.groupby(groups, sort=False)
+        
+        if merge_strategy == "latest_wins":
+            # Les enregistrements suivants sont supposés plus récents
+            merged = grouped.last()
+        elif merge_strategy == "first_wins":
+            merged = grouped.first()
+        else:
+            merged = grouped.agg(self._concatenate_values)
+        
+        # Colonne vide dans tout le groupe: valeur d'origine ("" conservé), sinon None
+        # (un NaN n'est pas sérialisable en JSON)
+        merged = merged.where(merged.notna(), members.groupby(groups, sort=False).last())
+        return merged.astype(object).where(merged.notna(), None)
+    
+    @staticmethod
+    def _concatenate_values(values: pd.Series) -> Any:
+        """Stratégie de fusion: concaténation des valeurs présentes"""
+        values = values.dropna()
+        if len(values) == 0:
+            return None
+        if len(values) == 1:
+            return values.iloc[0]
+        return " | ".join(map(str, values))
+    
+    def _calculate_confidence_scores(self, matches: List[Dict[str, Any]]) -> Dict[str, float]:
         """Calcule les scores de confiance"""
         if not matches:
             return {}
         
-        scores = [match["similarity_score"] for match in matches]
+        scores = np.fromiter(
+            (match["similarity_score"] for match in matches), dtype=np.float64, count=len(matches)
+        )
+        
+        # Un seul tableau contigu: statistiques et comptes par tranche sans listes intermédiaires
+        mean = scores.mean()
+        high_count = int(np.count_nonzero(scores > 0.9))
+        low_count = int(np.count_nonzero(scores < 0.7))
         
         return {
-            "average_confidence": np.mean(scores),
-            "min_confidence": np.min(scores),
-            "max_confidence": np.max(scores),
-            "std_confidence": np.std(scores),
-            "high_confidence_count": len([s for s in scores if s > 0.9]),
-            "medium_confidence_count": len([s for s in scores if 0.7 <= s <= 0.9]),
-            "low_confidence_count": len([s for s in scores if s < 0.7])
+            "average_confidence": float(mean),
+            "min_confidence": float(scores.min()),
+            "max_confidence": float(scores.max()),
+            "std_confidence": float(np.sqrt(np.mean((scores - mean) ** 2))),
+            "high_confidence_count": high_count,
+            "medium_confidence_count": len(scores) - high_count - low_count,
+            "low_confidence_count": low_count
         }
     
     async def find_matches(
@@ -287,7 +1028,7 @@ class ZinggClient:
         """Trouve les correspondances sans fusion"""
         
         df = pd.DataFrame(data)
-        matches = await self._find_entity_matches(df, matching_config, threshold)
+        matches = await asyncio.to_thread(self._find_entity_matches, df, matching_config, threshold)
         
         return matches
     
@@ -299,7 +1040,7 @@ class ZinggClient:
         """Déduplique les données"""
         
         df = pd.DataFrame(data)
-        deduplicated_df = await self._deduplicate_dataframe(df, config)
+        deduplicated_df = await asyncio.to_thread(self._deduplicate_dataframe, df, config)
         
         return deduplicated_df.to_dict('records')
     
@@ -349,27 +1090,49 @@ class ZinggClient:
         
         return model_info
     
+    def _record_history(self, entry: Dict[str, Any]) -> None:
+        """Ajoute une entrée à l'historique borné en retirant de l'index l'entrée évincée"""
+        with self._lock:
+            if len(self.reconciliation_history) == self.reconciliation_history.maxlen:
+                evicted = self.reconciliation_history.popleft()
+                self._history_index.pop(evicted["reconciliation_id"], None)
+            
+            self.reconciliation_history.append(entry)
+            self._history_index[entry["reconciliation_id"]] = entry
+            self._total_reconciliations += 1
+    
     async def get_reconciliation_history(self, limit: int = 100, offset: int = 0) -> List[Dict]:
         """Récupère l'historique des réconciliations"""
-        return self.reconciliation_history[offset:offset+limit]
+        return list(islice(self.reconciliation_history, offset, offset + limit))
     
     async def get_reconciliation_by_id(self, reconciliation_id: str) -> Optional[Dict]:
         """Récupère une réconciliation par son ID"""
-        for reconciliation in self.reconciliation_history:
-            if reconciliation["reconciliation_id"] == reconciliation_id:
-                return reconciliation
-        return None
+        return self._history_index.get(reconciliation_id)
     
     async def get_service_metrics(self) -> Dict[str, Any]:
         """Récupère les métriques du service"""
-        total_reconciliations = len(self.reconciliation_history)
+        total_reconciliations = self._total_reconciliations
         
         uptime = (datetime.now() - self.start_time).total_seconds()
+        system_metrics = self._get_system_metrics()
         
         return {
             "total_reconciliations": total_reconciliations,
             "uptime_seconds": uptime,
-            "memory_usage_mb": psutil.virtual_memory().used / 1024 / 1024,
-            "cpu_usage_percent": psutil.cpu_percent(),
+            "memory_usage_mb": system_metrics["memory_usage_mb"],
+            "cpu_usage_percent": system_metrics["cpu_usage_percent"],
             "last_updated": datetime.now().isoformat()
         }
+    
+    def _get_system_metrics(self) -> Dict[str, float]:
+        """Lit les métriques système psutil avec un cache de courte durée"""
+        now = time.monotonic()
+        if self._system_metrics is None or now - self._system_metrics_ts >= settings.system_metrics_ttl:
+            self._system_metrics = {
+                "memory_usage_mb": psutil.virtual_memory().used / 1024 / 1024,
+                # interval=None: lecture non bloquante depuis le dernier échantillon
+                "cpu_usage_percent": psutil.cpu_percent(interval=None)
+            }
+            self._system_metrics_ts = now
+        
+        return self._system_metrics
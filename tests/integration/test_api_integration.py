@@ -3,17 +3,121 @@ Tests d'intégration pour l'API Dashboard
 """
 
 import pytest
+import pytest_asyncio
 import httpx
 import asyncio
-from datetime import datetime
+import importlib.util
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+DASHBOARD_APP_DIR = os.path.join(os.path.dirname(__file__), '../../api-dashboard-service/app')
+
+# (clé d'URL, chemin de santé, nom de service attendu, libellé) de chaque service
+SERVICE_HEALTH_CHECKS = [
+    ("dbt_service", "/health", "dbt-transformation", "DBT"),
+    ("reconciliation_service", "/health", "reconciliation-service", "de réconciliation"),
+    ("quality_control_service", "/health", "quality-control-service", "de contrôle qualité"),
+    ("rca_service", "/health", "rca-service", "RCA"),
+    # NiFi n'expose pas d'endpoint /health: seul le code de l'interface est vérifié
+    ("nifi_service", "/nifi/", None, "NiFi"),
+]
+
+# Balayage de charge de /health: requêtes par palier et seuils de latence (s), optionnels:
+# sans PERF_MAX_P50 / PERF_MAX_P95, les percentiles sont seulement rapportés
+LOAD_SWEEP_REQUESTS = 100
+MAX_P50_LATENCY = float(os.environ["PERF_MAX_P50"]) if os.environ.get("PERF_MAX_P50") else None
+MAX_P95_LATENCY = float(os.environ["PERF_MAX_P95"]) if os.environ.get("PERF_MAX_P95") else None
+
+async def poll_until(request, ready, timeout: float = 5.0):
+    """Répète `request` avec un délai exponentiel (50 ms à 500 ms) jusqu'à ce que
+    `ready(response)` soit vrai ou que le délai soit écoulé; retourne la dernière réponse"""
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while True:
+        response = await request()
+        if ready(response) or time.monotonic() >= deadline:
+            return response
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+@pytest.fixture(scope="module")
+def upstream_status():
+    """Codes HTTP renvoyés par les services amont simulés, par hôte (200 par défaut)"""
+    return {}
+
+@pytest.fixture(scope="module")
+def dashboard_main(tmp_path_factory, upstream_status):
+    """Module main de l'API Dashboard chargé en processus, ses appels aux services amont
+    (santé, métriques) servis par un MockTransport"""
+    pytest.importorskip("jinja2")
+    
+    def upstream(request: httpx.Request) -> httpx.Response:
+        status_code = upstream_status.get(request.url.host, 200)
+        if request.url.path == "/health":
+            return httpx.Response(status_code, json={"status": "healthy", "service": request.url.host})
+        return httpx.Response(status_code, json={"requests_total": 0})
+    
+    class UpstreamClient(httpx.AsyncClient):
+        def __init__(self, **kwargs):
+            super().__init__(transport=httpx.MockTransport(upstream), **kwargs)
+    
+    # Modules homonymes d'autres services (config, models): restaurés après le chargement
+    shadowed = {name: sys.modules.pop(name, None) for name in ("config", "models", "endpoints")}
+    sys.path.insert(0, DASHBOARD_APP_DIR)
+    # StaticFiles exige un répertoire static/ relatif au répertoire courant
+    workdir = tmp_path_factory.mktemp("api-dashboard")
+    (workdir / "static").mkdir()
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        spec = importlib.util.spec_from_file_location("dashboard_main", os.path.join(DASHBOARD_APP_DIR, "main.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        os.chdir(cwd)
+        sys.path.remove(DASHBOARD_APP_DIR)
+        for name, previous in shadowed.items():
+            sys.modules.pop(name, None)
+            if previous is not None:
+                sys.modules[name] = previous
+    
+    module.httpx = SimpleNamespace(AsyncClient=UpstreamClient)
+    return module
+
+@pytest_asyncio.fixture(scope="module")
+async def api_client(request, pytestconfig, http_client):
+    """Client des tests de l'API Dashboard: application en processus (ASGITransport, services
+    amont simulés) par défaut, services réels avec --live"""
+    if pytestconfig.getoption("live"):
+        yield http_client
+        return
+    
+    dashboard_app = request.getfixturevalue("dashboard_main").app
+    # ASGITransport ignore l'hôte: les URLs de service_urls restent valables
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=dashboard_app)) as client:
+        yield client
+
+@pytest_asyncio.fixture(scope="session", autouse=True)
+async def warmup(pytestconfig, http_client, service_urls):
+    """Ouvre une connexion du pool avant le premier test avec --live (DNS, TCP, TLS hors des
+    mesures); un service indisponible est laissé aux tests qui le signalent eux-mêmes"""
+    if not pytestconfig.getoption("live"):
+        return
+    try:
+        await http_client.get(f"{service_urls['api_dashboard']}/health")
+    except httpx.TransportError:
+        pass
 
 class TestAPIDashboardIntegration:
     """Tests d'intégration pour l'API Dashboard"""
     
     @pytest.mark.asyncio
-    async def test_health_check(self, http_client, service_urls):
+    async def test_health_check(self, api_client, service_urls):
         """Test de vérification de santé de l'API Dashboard"""
-        response = await http_client.get(f"{service_urls['api_dashboard']}/health")
+        response = await api_client.get(f"{service_urls['api_dashboard']}/health")
         
         assert response.status_code == 200
         data = response.json()
@@ -27,9 +131,26 @@ class TestAPIDashboardIntegration:
         assert data["status"] in ["healthy", "degraded"]
     
     @pytest.mark.asyncio
-    async def test_dashboard_data_endpoint(self, http_client, service_urls):
+    async def test_health_check_degraded(self, pytestconfig, api_client, service_urls, upstream_status):
+        """Un service amont en erreur rend l'état global dégradé"""
+        if pytestconfig.getoption("live"):
+            pytest.skip("Nécessite les services amont simulés")
+        upstream_status["rca-service"] = 503
+        try:
+            response = await api_client.get(f"{service_urls['api_dashboard']}/health")
+        finally:
+            upstream_status.clear()
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "degraded"
+        assert data["services"]["rca-service"] == "unhealthy"
+        assert data["services"]["dbt-service"] == "healthy"
+    
+    @pytest.mark.asyncio
+    async def test_dashboard_data_endpoint(self, api_client, service_urls):
         """Test de l'endpoint de données du dashboard"""
-        response = await http_client.get(f"{service_urls['api_dashboard']}/dashboard/data")
+        response = await api_client.get(f"{service_urls['api_dashboard']}/dashboard/data")
         
         assert response.status_code == 200
         data = response.json()
@@ -47,9 +168,9 @@ class TestAPIDashboardIntegration:
         assert "active_alerts" in overview
     
     @pytest.mark.asyncio
-    async def test_metrics_overview_endpoint(self, http_client, service_urls):
+    async def test_metrics_overview_endpoint(self, api_client, service_urls):
         """Test de l'endpoint de vue d'ensemble des métriques"""
-        response = await http_client.get(f"{service_urls['api_dashboard']}/metrics/overview")
+        response = await api_client.get(f"{service_urls['api_dashboard']}/metrics/overview")
         
         assert response.status_code == 200
         data = response.json()
@@ -70,9 +191,9 @@ class TestAPIDashboardIntegration:
         assert "error_rate" in performance
     
     @pytest.mark.asyncio
-    async def test_kpis_endpoint(self, http_client, service_urls):
+    async def test_kpis_endpoint(self, api_client, service_urls):
         """Test de l'endpoint des KPI"""
-        response = await http_client.get(f"{service_urls['api_dashboard']}/kpis")
+        response = await api_client.get(f"{service_urls['api_dashboard']}/kpis")
         
         assert response.status_code == 200
         data = response.json()
@@ -90,9 +211,9 @@ class TestAPIDashboardIntegration:
         assert "validity" in data_quality
     
     @pytest.mark.asyncio
-    async def test_data_ingestion_endpoint(self, http_client, service_urls, sample_data):
+    async def test_data_ingestion_endpoint(self, api_client, service_urls, sample_data):
         """Test de l'endpoint d'ingestion de données"""
-        response = await http_client.post(
+        response = await api_client.post(
             f"{service_urls['api_dashboard']}/data/ingest",
             json=sample_data
         )
@@ -109,9 +230,9 @@ class TestAPIDashboardIntegration:
         assert data["records_count"] == len(sample_data)
     
     @pytest.mark.asyncio
-    async def test_reports_endpoint(self, http_client, service_urls):
+    async def test_reports_endpoint(self, api_client, service_urls):
         """Test de l'endpoint de génération de rapports"""
-        response = await http_client.get(
+        response = await api_client.get(
             f"{service_urls['api_dashboard']}/reports",
             params={"report_type": "summary"}
         )
@@ -126,7 +247,7 @@ class TestAPIDashboardIntegration:
         assert data["report_type"] == "summary"
     
     @pytest.mark.asyncio
-    async def test_alert_configuration_endpoint(self, http_client, service_urls):
+    async def test_alert_configuration_endpoint(self, api_client, service_urls):
         """Test de l'endpoint de configuration des alertes"""
         alert_config = {
             "name": "Test Alert",
@@ -135,7 +256,7 @@ class TestAPIDashboardIntegration:
             "severity": "warning"
         }
         
-        response = await http_client.post(
+        response = await api_client.post(
             f"{service_urls['api_dashboard']}/alerts/configure",
             json=alert_config
         )
@@ -150,9 +271,9 @@ class TestAPIDashboardIntegration:
         assert data["status"] == "configured"
     
     @pytest.mark.asyncio
-    async def test_logs_endpoint(self, http_client, service_urls):
+    async def test_logs_endpoint(self, api_client, service_urls):
         """Test de l'endpoint de récupération des logs"""
-        response = await http_client.get(
+        response = await api_client.get(
             f"{service_urls['api_dashboard']}/logs",
             params={"limit": 10}
         )
@@ -170,73 +291,37 @@ class TestServiceIntegration:
     """Tests d'intégration pour les services individuels"""
     
     @pytest.mark.asyncio
-    async def test_dbt_service_health(self, http_client, service_urls):
-        """Test de santé du service DBT"""
-        try:
-            response = await http_client.get(f"{service_urls['dbt_service']}/health")
-            assert response.status_code == 200
-            
-            data = response.json()
-            assert "status" in data
-            assert "service" in data
-            assert data["service"] == "dbt-transformation"
-        except httpx.ConnectError:
-            pytest.skip("Service DBT non disponible")
-    
-    @pytest.mark.asyncio
-    async def test_reconciliation_service_health(self, http_client, service_urls):
-        """Test de santé du service de réconciliation"""
-        try:
-            response = await http_client.get(f"{service_urls['reconciliation_service']}/health")
-            assert response.status_code == 200
-            
-            data = response.json()
-            assert "status" in data
-            assert "service" in data
-            assert data["service"] == "reconciliation-service"
-        except httpx.ConnectError:
-            pytest.skip("Service de réconciliation non disponible")
-    
-    @pytest.mark.asyncio
-    async def test_quality_control_service_health(self, http_client, service_urls):
-        """Test de santé du service de contrôle qualité"""
-        try:
-            response = await http_client.get(f"{service_urls['quality_control_service']}/health")
-            assert response.status_code == 200
-            
-            data = response.json()
-            assert "status" in data
-            assert "service" in data
-            assert data["service"] == "quality-control-service"
-        except httpx.ConnectError:
-            pytest.skip("Service de contrôle qualité non disponible")
-    
-    @pytest.mark.asyncio
-    async def test_rca_service_health(self, http_client, service_urls):
-        """Test de santé du service RCA"""
-        try:
-            response = await http_client.get(f"{service_urls['rca_service']}/health")
-            assert response.status_code == 200
+    async def test_all_services_health(self, http_client, service_urls):
+        """Test de santé de tous les services, interrogés en parallèle"""
+        responses = await asyncio.gather(
+            *[
+                http_client.get(f"{service_urls[service_key]}{health_path}")
+                for service_key, health_path, _, _ in SERVICE_HEALTH_CHECKS
+            ],
+            return_exceptions=True
+        )
+        
+        unavailable = []
+        for (_, _, expected_service, label), response in zip(SERVICE_HEALTH_CHECKS, responses):
+            if isinstance(response, httpx.ConnectError):
+                unavailable.append(label)
+                continue
+            if isinstance(response, Exception):
+                raise response
             
-            data = response.json()
-            assert "status" in data
-            assert "service" in data
-            assert data["service"] == "rca-service"
-        except httpx.ConnectError:
-            pytest.skip("Service RCA non disponible")
-    
-    @pytest.mark.asyncio
-    async def test_nifi_service_health(self, http_client, service_urls):
-        """Test de santé du service NiFi"""
-        try:
-            response = await http_client.get(f"{service_urls['nifi_service']}/nifi/")
-            assert response.status_code == 200
-        except httpx.ConnectError:
-            pytest.skip("Service NiFi non disponible")
+            assert response.status_code == 200, f"Service {label} en erreur"
+            if expected_service is not None:
+                data = response.json()
+                assert "status" in data
+                assert data.get("service") == expected_service
+        
+        if len(unavailable) == len(SERVICE_HEALTH_CHECKS):
+            pytest.skip("Aucun service disponible")
 
 class TestDataFlowIntegration:
     """Tests d'intégration pour le flux de données"""
     
+    @pytest.mark.slow
     @pytest.mark.asyncio
     async def test_end_to_end_data_flow(self, http_client, service_urls, sample_data):
         """Test du flux de données de bout en bout"""
@@ -253,12 +338,10 @@ class TestDataFlowIntegration:
         assert ingest_data["status"] == "accepted"
         assert ingest_data["records_count"] == len(sample_data)
         
-        # 3. Attendre un peu pour le traitement
-        await asyncio.sleep(2)
-        
-        # 4. Vérifier les métriques système
-        metrics_response = await http_client.get(
-            f"{service_urls['api_dashboard']}/metrics/overview"
+        # 3-4. Interroger les métriques système jusqu'à ce qu'elles soient disponibles
+        metrics_response = await poll_until(
+            lambda: http_client.get(f"{service_urls['api_dashboard']}/metrics/overview"),
+            lambda response: response.status_code == 200 and "services" in response.json()
         )
         
         assert metrics_response.status_code == 200
@@ -295,38 +378,40 @@ class TestErrorHandling:
     """Tests de gestion d'erreurs"""
     
     @pytest.mark.asyncio
-    async def test_invalid_endpoint(self, http_client, service_urls):
-        """Test de réponse à un endpoint invalide"""
-        response = await http_client.get(f"{service_urls['api_dashboard']}/invalid-endpoint")
-        assert response.status_code == 404
-    
-    @pytest.mark.asyncio
-    async def test_invalid_data_ingestion(self, http_client, service_urls):
-        """Test d'ingestion de données invalides"""
-        invalid_data = "invalid json data"
-        
-        response = await http_client.post(
-            f"{service_urls['api_dashboard']}/data/ingest",
-            content=invalid_data,
-            headers={"Content-Type": "application/json"}
+    @pytest.mark.parametrize("method,path,body,headers,expected", [
+        # Endpoint invalide
+        ("GET", "/invalid-endpoint", None, None, 404),
+        # Ingestion de données invalides: Unprocessable Entity
+        ("POST", "/data/ingest", "invalid json data", {"Content-Type": "application/json"}, 422),
+        # Paramètres manquants: devrait fonctionner avec des paramètres par défaut
+        ("GET", "/kpis", None, None, 200),
+    ], ids=["invalid_endpoint", "invalid_data_ingestion", "missing_parameters"])
+    async def test_error_responses(self, api_client, service_urls, method, path, body, headers, expected):
+        """Test des codes de réponse sur requêtes invalides ou incomplètes"""
+        response = await api_client.request(
+            method,
+            f"{service_urls['api_dashboard']}{path}",
+            content=body,
+            headers=headers
         )
-        
-        assert response.status_code == 422  # Unprocessable Entity
-    
-    @pytest.mark.asyncio
-    async def test_missing_parameters(self, http_client, service_urls):
-        """Test avec des paramètres manquants"""
-        response = await http_client.get(f"{service_urls['api_dashboard']}/kpis")
-        
-        # Devrait fonctionner avec des paramètres par défaut
-        assert response.status_code == 200
+        assert response.status_code == expected
 
+@pytest.mark.perf
 class TestPerformance:
     """Tests de performance"""
     
+    @pytest_asyncio.fixture(scope="class", autouse=True)
+    async def warmup_aiohttp(self, aiohttp_session, service_urls):
+        """Même préchauffage pour la session aiohttp utilisée par les mesures"""
+        try:
+            async with aiohttp_session.get(f"{service_urls['api_dashboard']}/health") as response:
+                await response.read()
+        except OSError:
+            pass
+    
     @pytest.mark.asyncio
-    async def test_response_times(self, http_client, service_urls):
-        """Test des temps de réponse des endpoints"""
+    async def test_response_times(self, aiohttp_session, service_urls, bounded_gather):
+        """Test des temps de réponse des endpoints (mesurés en parallèle)"""
         endpoints = [
             "/health",
             "/dashboard/data",
@@ -336,27 +421,49 @@ class TestPerformance:
         
         max_response_time = 5.0  # 5 secondes maximum
         
-        for endpoint in endpoints:
-            start_time = datetime.now()
-            response = await http_client.get(f"{service_urls['api_dashboard']}{endpoint}")
-            end_time = datetime.now()
-            
-            response_time = (end_time - start_time).total_seconds()
-            
-            assert response.status_code == 200
+        async def timed_request(endpoint):
+            start_time = time.perf_counter()
+            async with aiohttp_session.get(f"{service_urls['api_dashboard']}{endpoint}") as response:
+                await response.read()
+                status = response.status
+            return endpoint, status, time.perf_counter() - start_time
+        
+        results = await bounded_gather([timed_request(endpoint) for endpoint in endpoints])
+        
+        for endpoint, status, response_time in results:
+            assert status == 200
             assert response_time < max_response_time, f"Endpoint {endpoint} trop lent: {response_time}s"
     
     @pytest.mark.asyncio
-    async def test_concurrent_requests(self, http_client, service_urls):
-        """Test de requêtes concurrentes"""
-        async def make_request():
-            response = await http_client.get(f"{service_urls['api_dashboard']}/health")
-            return response.status_code == 200
+    @pytest.mark.parametrize("concurrency", [1, 10, 50, 100])
+    async def test_concurrent_requests(
+        self, aiohttp_session, service_urls, bounded_gather, record_property, concurrency
+    ):
+        """Test de requêtes concurrentes: taux d'erreur nul, latences p50/p95 par palier de concurrence"""
+        timings = []
         
-        # Faire 10 requêtes concurrentes
-        tasks = [make_request() for _ in range(10)]
-        results = await asyncio.gather(*tasks)
+        async def make_request():
+            start_time = time.perf_counter()
+            async with aiohttp_session.get(f"{service_urls['api_dashboard']}/health") as response:
+                await response.read()
+                timings.append(time.perf_counter() - start_time)
+                return response.status == 200
+        
+        # Au plus `concurrency` requêtes en vol à la fois
+        results = await bounded_gather(
+            [make_request() for _ in range(LOAD_SWEEP_REQUESTS)], limit=concurrency
+        )
         
         # Toutes les requêtes devraient réussir
         assert all(results)
-        assert len(results) == 10
+        assert len(results) == LOAD_SWEEP_REQUESTS
+        
+        p50 = statistics.median(timings)
+        p95 = statistics.quantiles(timings, n=20)[18]
+        # Rapportés dans le rapport JUnit (--junitxml)
+        record_property("p50_seconds", round(p50, 4))
+        record_property("p95_seconds", round(p95, 4))
+        if MAX_P50_LATENCY is not None:
+            assert p50 < MAX_P50_LATENCY, f"p50 trop élevé à {concurrency} requêtes concurrentes: {p50:.3f}s"
+        if MAX_P95_LATENCY is not None:
+            assert p95 < MAX_P95_LATENCY, f"p95 trop élevé à {concurrency} requêtes concurrentes: {p95:.3f}s"
@@ -3,6 +3,7 @@ Tests unitaires pour le service DBT
 """
 
 import pytest
+import pytest_asyncio
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -16,17 +17,21 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../../dbt-service/app')
 from services import DataTransformationService, KPIService
 from models import TransformationType, KPIMetric
 
+def _df(records, schema):
+    """DataFrame typé construit depuis des enregistrements, sans inférence colonne par colonne"""
+    return pd.DataFrame.from_records(records, columns=list(schema)).astype(schema)
+
 class TestDataTransformationService:
     """Tests pour le service de transformation de données"""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def transformation_service(self):
         """Instance du service de transformation"""
         return DataTransformationService()
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_data(self):
-        """Données d'exemple pour les tests"""
+        """Données d'exemple pour les tests (lecture seule, partagées par le module)"""
         return [
             {"id": 1, "name": "John Doe", "value": 100.5, "date": "2024-01-01"},
             {"id": 2, "name": "Jane Smith", "value": 200.75, "date": "2024-01-02"},
@@ -34,18 +39,16 @@ class TestDataTransformationService:
         ]
     
     @pytest.mark.asyncio
-    async def test_clean_data_remove_duplicates(self, transformation_service, sample_data):
+    async def test_clean_data_remove_duplicates(self, transformation_service, sample_df):
         """Test de nettoyage avec suppression des doublons"""
-        # Ajout de doublons
-        data_with_duplicates = sample_data + sample_data[:1]
-        
-        df = pd.DataFrame(data_with_duplicates)
+        # Ajout de doublons (concat crée un nouveau DataFrame)
+        df = pd.concat([sample_df, sample_df.iloc[:1]], ignore_index=True)
         parameters = {"remove_duplicates": True}
         
         result = await transformation_service._clean_data(df, parameters)
         
-        assert len(result) == len(sample_data)
-        assert result["id"].nunique() == len(sample_data)
+        assert len(result) == len(sample_df)
+        assert result["id"].nunique() == len(sample_df)
     
     @pytest.mark.asyncio
     async def test_clean_data_fill_missing_values(self, transformation_service):
@@ -56,7 +59,8 @@ class TestDataTransformationService:
             {"id": 3, "name": "Bob", "value": 200}
         ]
         
-        df = pd.DataFrame(data_with_missing)
+        # name reste en object: le dtype string refuserait le remplissage par 0
+        df = _df(data_with_missing, {"id": "int64", "name": "object", "value": "float64"})
         parameters = {
             "missing_value_strategy": "fill",
             "fill_value": 0
@@ -76,7 +80,7 @@ class TestDataTransformationService:
             {"id": 3, "value": 30}
         ]
         
-        df = pd.DataFrame(data)
+        df = _df(data, {"id": "int64", "value": "int64"})
         parameters = {"normalize_numeric": True}
         
         result = await transformation_service._normalize_data(df, parameters)
@@ -97,7 +101,7 @@ class TestDataTransformationService:
             {"category": "B", "value": 25}
         ]
         
-        df = pd.DataFrame(data)
+        df = _df(data, {"category": "string", "value": "int64"})
         parameters = {
             "group_by": ["category"],
             "aggregations": {"value": "sum"}
@@ -110,9 +114,10 @@ class TestDataTransformationService:
         assert result[result["category"] == "B"]["value"].iloc[0] == 40
     
     @pytest.mark.asyncio
-    async def test_filter_data(self, transformation_service, sample_data):
+    async def test_filter_data(self, transformation_service, sample_df):
         """Test de filtrage des données"""
-        df = pd.DataFrame(sample_data)
+        # Le filtrage renvoie une sélection sans modifier le DataFrame partagé
+        df = sample_df
         parameters = {
             "filters": {
                 "value": {
@@ -127,6 +132,7 @@ class TestDataTransformationService:
         assert len(result) == 1
         assert result.iloc[0]["name"] == "Jane Smith"
     
+    @pytest.mark.xdist_group(name="dbt_service_state")
     @pytest.mark.asyncio
     async def test_execute_transformation_clean(self, transformation_service, sample_data):
         """Test d'exécution de transformation de type clean"""
@@ -142,6 +148,8 @@ class TestDataTransformationService:
         assert "execution_time" in result
         assert result["execution_time"] > 0
     
+    @pytest.mark.slow
+    @pytest.mark.xdist_group(name="dbt_service_state")
     @pytest.mark.asyncio
     async def test_execute_transformation_error_handling(self, transformation_service):
         """Test de gestion d'erreur lors de la transformation"""
@@ -157,14 +165,14 @@ class TestDataTransformationService:
 class TestKPIService:
     """Tests pour le service de calcul de KPI"""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def kpi_service(self):
         """Instance du service KPI"""
         return KPIService()
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_data_with_numeric(self):
-        """Données avec des colonnes numériques pour les tests KPI"""
+        """Données avec des colonnes numériques pour les tests KPI (lecture seule)"""
         return [
             {"id": 1, "value": 10, "score": 85},
             {"id": 2, "value": 20, "score": 90},
@@ -172,105 +180,91 @@ class TestKPIService:
             {"id": 4, "value": 40, "score": 88}
         ]
     
-    @pytest.mark.asyncio
-    async def test_calculate_kpis_count(self, kpi_service, sample_data_with_numeric):
-        """Test de calcul du KPI count"""
-        result = await kpi_service.calculate_kpis(
+    @pytest_asyncio.fixture(scope="module")
+    async def all_kpis(self, kpi_service, sample_data_with_numeric):
+        """Tous les KPI calculés en un seul appel, partagés par les tests du module"""
+        return await kpi_service.calculate_kpis(
             data=sample_data_with_numeric,
-            metrics=[KPIMetric.COUNT]
+            metrics=[
+                KPIMetric.COUNT, KPIMetric.SUM, KPIMetric.AVG, KPIMetric.MIN,
+                KPIMetric.MAX, KPIMetric.MEDIAN, KPIMetric.STANDARD_DEVIATION
+            ]
         )
-        
-        assert "count" in result
-        assert result["count"] == 4
     
-    @pytest.mark.asyncio
-    async def test_calculate_kpis_sum(self, kpi_service, sample_data_with_numeric):
+    def test_calculate_kpis_count(self, all_kpis):
+        """Test de calcul du KPI count"""
+        assert "count" in all_kpis
+        assert all_kpis["count"] == 4
+    
+    def test_calculate_kpis_sum(self, all_kpis):
         """Test de calcul du KPI sum"""
-        result = await kpi_service.calculate_kpis(
-            data=sample_data_with_numeric,
-            metrics=[KPIMetric.SUM]
-        )
-        
-        assert "sum" in result
-        assert "value" in result["sum"]
-        assert "score" in result["sum"]
-        assert result["sum"]["value"] == 100  # 10+20+30+40
-        assert result["sum"]["score"] == 358  # 85+90+95+88
+        assert "sum" in all_kpis
+        assert "value" in all_kpis["sum"]
+        assert "score" in all_kpis["sum"]
+        assert all_kpis["sum"]["value"] == 100  # 10+20+30+40
+        assert all_kpis["sum"]["score"] == 358  # 85+90+95+88
     
-    @pytest.mark.asyncio
-    async def test_calculate_kpis_average(self, kpi_service, sample_data_with_numeric):
+    def test_calculate_kpis_average(self, all_kpis):
         """Test de calcul du KPI average"""
-        result = await kpi_service.calculate_kpis(
-            data=sample_data_with_numeric,
-            metrics=[KPIMetric.AVG]
-        )
-        
-        assert "average" in result
-        assert "value" in result["average"]
-        assert "score" in result["average"]
-        assert result["average"]["value"] == 25.0  # 100/4
-        assert result["average"]["score"] == 89.5  # 358/4
+        assert "average" in all_kpis
+        assert "value" in all_kpis["average"]
+        assert "score" in all_kpis["average"]
+        assert all_kpis["average"]["value"] == 25.0  # 100/4
+        assert all_kpis["average"]["score"] == 89.5  # 358/4
     
-    @pytest.mark.asyncio
-    async def test_calculate_kpis_min_max(self, kpi_service, sample_data_with_numeric):
+    def test_calculate_kpis_min_max(self, all_kpis):
         """Test de calcul des KPI min et max"""
-        result = await kpi_service.calculate_kpis(
-            data=sample_data_with_numeric,
-            metrics=[KPIMetric.MIN, KPIMetric.MAX]
-        )
-        
-        assert "min" in result
-        assert "max" in result
-        assert result["min"]["value"] == 10
-        assert result["max"]["value"] == 40
-        assert result["min"]["score"] == 85
-        assert result["max"]["score"] == 95
+        assert "min" in all_kpis
+        assert "max" in all_kpis
+        assert all_kpis["min"]["value"] == 10
+        assert all_kpis["max"]["value"] == 40
+        assert all_kpis["min"]["score"] == 85
+        assert all_kpis["max"]["score"] == 95
     
-    @pytest.mark.asyncio
-    async def test_calculate_kpis_multiple(self, kpi_service, sample_data_with_numeric):
-        """Test de calcul de plusieurs KPI en une fois"""
-        result = await kpi_service.calculate_kpis(
-            data=sample_data_with_numeric,
-            metrics=[KPIMetric.COUNT, KPIMetric.SUM, KPIMetric.AVG, KPIMetric.MIN, KPIMetric.MAX]
-        )
-        
-        assert "count" in result
-        assert "sum" in result
-        assert "average" in result
-        assert "min" in result
-        assert "max" in result
+    def test_calculate_kpis_multiple(self, all_kpis):
+        """Test de cohérence de plusieurs KPI calculés en une fois"""
+        for key in ["count", "sum", "average", "min", "max", "median", "std_dev"]:
+            assert key in all_kpis
         
         # Vérifier la cohérence des résultats
-        assert result["count"] == 4
-        assert result["sum"]["value"] / result["count"] == result["average"]["value"]
-        assert result["min"]["value"] <= result["max"]["value"]
+        assert all_kpis["count"] == 4
+        assert all_kpis["sum"]["value"] / all_kpis["count"] == all_kpis["average"]["value"]
+        assert all_kpis["min"]["value"] <= all_kpis["median"]["value"] <= all_kpis["max"]["value"]
+        assert all_kpis["std_dev"]["value"] > 0
 
 class TestTransformationTypes:
     """Tests pour les types de transformation"""
     
-    def test_transformation_type_enum(self):
+    @pytest.mark.parametrize("member,value", [
+        (TransformationType.CLEAN, "clean"),
+        (TransformationType.NORMALIZE, "normalize"),
+        (TransformationType.AGGREGATE, "aggregate"),
+        (TransformationType.JOIN, "join"),
+        (TransformationType.FILTER, "filter"),
+        (TransformationType.PIVOT, "pivot"),
+        (TransformationType.CUSTOM, "custom"),
+    ])
+    def test_transformation_type_value(self, member, value):
         """Test des valeurs de l'enum TransformationType"""
-        assert TransformationType.CLEAN == "clean"
-        assert TransformationType.NORMALIZE == "normalize"
-        assert TransformationType.AGGREGATE == "aggregate"
-        assert TransformationType.JOIN == "join"
-        assert TransformationType.FILTER == "filter"
-        assert TransformationType.PIVOT == "pivot"
-        assert TransformationType.CUSTOM == "custom"
+        assert member == value
     
-    def test_kpi_metric_enum(self):
+    @pytest.mark.parametrize("member,value", [
+        (KPIMetric.COUNT, "count"),
+        (KPIMetric.SUM, "sum"),
+        (KPIMetric.AVG, "average"),
+        (KPIMetric.MIN, "min"),
+        (KPIMetric.MAX, "max"),
+        (KPIMetric.MEDIAN, "median"),
+        (KPIMetric.STANDARD_DEVIATION, "std_dev"),
+        (KPIMetric.PERCENTILE, "percentile"),
+        (KPIMetric.GROWTH_RATE, "growth_rate"),
+        (KPIMetric.CUSTOM, "custom"),
+    ])
+    def test_kpi_metric_value(self, member, value):
         """Test des valeurs de l'enum KPIMetric"""
-        assert KPIMetric.COUNT == "count"
-        assert KPIMetric.SUM == "sum"
-        assert KPIMetric.AVG == "average"
-        assert KPIMetric.MIN == "min"
-        assert KPIMetric.MAX == "max"
-        assert KPIMetric.MEDIAN == "median"
-        assert KPIMetric.STANDARD_DEVIATION == "std_dev"
-        assert KPIMetric.PERCENTILE == "percentile"
-        assert KPIMetric.GROWTH_RATE == "growth_rate"
-        assert KPIMetric.CUSTOM == "custom"
+        assert member == value
 
+@pytest.mark.xdist_group(name="dbt_service_state")
 @pytest.mark.asyncio
 async def test_service_metrics():
     """Test de récupération des métriques du service"""
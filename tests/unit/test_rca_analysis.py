@@ -0,0 +1,368 @@
+"""
+Tests unitaires pour le service RCA
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from scipy import stats
+from fastapi.testclient import TestClient
+
+# Import des modules à tester
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../rca-service/app'))
+# Chaque service a son propre module config
+sys.modules.pop("config", None)
+
+import analysis
+from analysis import (
+    CorrelationAnalysisService, RCAAnalysisService, _batch_linregress, _centered_gram_matrix, _fast_pearson_no_nan,
+    _pairwise_pearson_with_nan, _pairwise_spearman_with_nan, _to_dataframe, records_to_columns
+)
+from main import CorrelationAnalysisRequest, app
+
+@pytest.fixture(scope="module")
+def sparse_metrics_df():
+    """Métriques avec valeurs manquantes dispersées, une colonne constante et une paire
+    n'ayant qu'une observation commune"""
+    rng = np.random.default_rng(42)
+    n = 40
+    base = rng.normal(size=n)
+    df = pd.DataFrame({
+        "latency": base + rng.normal(scale=0.5, size=n),
+        "errors": -base + rng.normal(scale=0.5, size=n),
+        "throughput": rng.normal(size=n),
+        "constant": np.full(n, 3.0),
+        "early": rng.normal(size=n),
+        "late": rng.normal(size=n),
+    })
+    df.loc[rng.choice(n, 8, replace=False), "latency"] = np.nan
+    df.loc[rng.choice(n, 6, replace=False), "errors"] = np.nan
+    df.loc[rng.choice(n, 4, replace=False), "constant"] = np.nan
+    # Une seule ligne (19) observée à la fois pour early et late
+    df.loc[20:, "early"] = np.nan
+    df.loc[:18, "late"] = np.nan
+    # Valeurs ex aequo pour les rangs de Spearman
+    df.loc[[1, 2, 3], "throughput"] = 0.5
+    return df
+
+class TestPairwiseCorrelation:
+    """Parité des corrélations par paires avec DataFrame.corr()"""
+    
+    @pytest.mark.parametrize("method,correlate", [
+        ("pearson", lambda X, observed: _pairwise_pearson_with_nan(
+            X, observed, observed.astype(np.float64).T @ observed.astype(np.float64)
+        )),
+        ("spearman", _pairwise_spearman_with_nan),
+    ])
+    def test_matches_dataframe_corr(self, sparse_metrics_df, method, correlate):
+        """Même matrice que df.corr(method) (NaN aux mêmes positions)"""
+        X = sparse_metrics_df.to_numpy(dtype=np.float64)
+        
+        C = correlate(X, ~np.isnan(X))
+        expected = sparse_metrics_df.corr(method=method).to_numpy()
+        
+        np.testing.assert_allclose(C, expected, rtol=1e-9, atol=1e-12, equal_nan=True)
+        
+        columns = list(sparse_metrics_df.columns)
+        constant = columns.index("constant")
+        assert np.isnan(C[constant]).all()
+        assert np.isnan(C[columns.index("early"), columns.index("late")])
+
+class TestFastPearson:
+    """Chemin sans valeurs manquantes: matrice de Gram centrée par blocs"""
+    
+    @pytest.fixture
+    def dense_metrics(self):
+        """Métriques complètes, dont une colonne constante"""
+        rng = np.random.default_rng(3)
+        X = rng.normal(size=(101, 4))
+        X[:, 1] += 2.0 * X[:, 0]
+        X[:, 3] = 5.0
+        return X
+    
+    @pytest.mark.parametrize("memory_limit", [None, 1, 7 * 4 * 8, 10 ** 9])
+    def test_gram_matrix_blocks(self, dense_metrics, memory_limit):
+        """Le découpage en blocs (un, plusieurs, une ligne par bloc) ne change pas Xc.T @ Xc"""
+        Xc = dense_metrics - dense_metrics.mean(axis=0)
+        
+        np.testing.assert_allclose(_centered_gram_matrix(dense_metrics, memory_limit), Xc.T @ Xc, atol=1e-9)
+    
+    @pytest.mark.parametrize("memory_limit", [None, 10 * 4 * 8])
+    def test_matches_dataframe_corr(self, dense_metrics, memory_limit):
+        """Même matrice que df.corr(), avec une ou plusieurs passes (101 lignes, blocs de 10)"""
+        expected = pd.DataFrame(dense_metrics).corr().to_numpy()
+        
+        C = _fast_pearson_no_nan(dense_metrics.copy(), memory_limit)
+        
+        np.testing.assert_allclose(C, expected, rtol=1e-9, atol=1e-12, equal_nan=True)
+        assert np.isnan(C[3]).all()
+    
+    @pytest.mark.asyncio
+    async def test_analyze_correlations_with_small_memory_limit(self, dense_metrics, monkeypatch):
+        """analyze_correlations donne le même résultat quand correlation_memory_limit impose plusieurs blocs"""
+        variables = ["a", "b", "c"]
+        columns = {var: dense_metrics[:, j].copy() for j, var in enumerate(variables)}
+        
+        expected = await CorrelationAnalysisService().analyze_correlations(data=columns, variables=variables)
+        monkeypatch.setattr(analysis.settings, "correlation_memory_limit", 3 * 8 * 16)
+        blocked = await CorrelationAnalysisService().analyze_correlations(data=columns, variables=variables)
+        
+        for var in variables:
+            for other in variables:
+                assert blocked["correlation_matrix"][var][other] == pytest.approx(
+                    expected["correlation_matrix"][var][other], abs=1e-12
+                )
+        assert blocked["correlation_matrix"]["a"]["b"] == pytest.approx(
+            np.corrcoef(dense_metrics[:, 0], dense_metrics[:, 1])[0, 1]
+        )
+
+class TestBatchLinregress:
+    """Parité de la régression vectorisée avec scipy.stats.linregress"""
+    
+    def test_matches_scipy_linregress(self):
+        """Pentes, r, p-values et nombres de points identiques colonne par colonne"""
+        rng = np.random.default_rng(7)
+        n = 30
+        x = np.arange(n, dtype=np.float64)
+        x[[4, 17]] = np.nan
+        Y = np.column_stack([
+            2.0 * x + rng.normal(size=n),
+            -0.5 * x + rng.normal(scale=5.0, size=n),
+            rng.normal(size=n),
+            np.full(n, 7.0),  # série constante
+        ])
+        Y[rng.choice(n, 5, replace=False), 0] = np.nan
+        Y[rng.choice(n, 9, replace=False), 2] = np.nan
+        
+        slopes, r_values, p_values, counts = _batch_linregress(x, Y)
+        
+        for column in range(Y.shape[1] - 1):
+            valid = ~(np.isnan(x) | np.isnan(Y[:, column]))
+            expected = stats.linregress(x[valid], Y[valid, column])
+            assert counts[column] == valid.sum()
+            assert slopes[column] == pytest.approx(expected.slope, rel=1e-9, abs=1e-12)
+            assert r_values[column] == pytest.approx(expected.rvalue, rel=1e-9, abs=1e-12)
+            assert p_values[column] == pytest.approx(expected.pvalue, rel=1e-6, abs=1e-12)
+        
+        # Série constante: pente nulle comme scipy, mais r = 0 et p = 1 (convention des
+        # anciennes versions de scipy, les récentes donnent NaN, non sérialisable en JSON)
+        valid = ~np.isnan(x)
+        assert counts[-1] == valid.sum()
+        assert slopes[-1] == stats.linregress(x[valid], Y[valid, -1]).slope == 0.0
+        assert r_values[-1] == 0.0
+        assert p_values[-1] == 1.0
+    
+    def test_insufficient_points(self):
+        """Moins de deux points valides: résultats indéfinis (NaN)"""
+        x = np.array([0.0, 1.0, 2.0])
+        Y = np.array([[np.nan], [np.nan], [1.0]])
+        
+        slopes, r_values, p_values, counts = _batch_linregress(x, Y)
+        
+        assert counts[0] == 1
+        assert np.isnan(slopes[0]) and np.isnan(r_values[0]) and np.isnan(p_values[0])
+
+class TestRecordsToColumns:
+    """Conversion des enregistrements en colonnes à la validation de la requête"""
+    
+    @pytest.fixture
+    def records(self):
+        """Enregistrements hétérogènes (clés manquantes, None, chaînes, booléens)"""
+        return [
+            {"cpu": 1, "memory": 0.5, "host": "a", "healthy": True, "empty": None},
+            {"cpu": 2.5, "host": "b", "healthy": False, "empty": None},
+            {"cpu": None, "memory": 1.5, "host": "c", "healthy": True},
+        ]
+    
+    def test_column_conversion(self, records):
+        """Numériques en float64 (NaN pour None/absent), non numériques à None, inconnues omises"""
+        columns = records_to_columns(records, ["cpu", "memory", "host", "healthy", "empty", "unknown", "cpu"])
+        
+        assert list(columns) == ["cpu", "memory", "host", "healthy", "empty"]
+        np.testing.assert_array_equal(columns["cpu"], [1.0, 2.5, np.nan])
+        np.testing.assert_array_equal(columns["memory"], [0.5, np.nan, 1.5])
+        assert columns["cpu"].dtype == np.float64
+        assert columns["host"] is None
+        assert columns["healthy"] is None
+        assert columns["empty"] is None
+    
+    def test_request_validator_builds_columns(self, records):
+        """Le validateur de CorrelationAnalysisRequest construit les colonnes des variables demandées"""
+        request = CorrelationAnalysisRequest(data=records, variables=["cpu", "memory", "host"])
+        
+        assert list(request.columns) == ["cpu", "memory", "host"]
+        np.testing.assert_array_equal(request.columns["memory"], [0.5, np.nan, 1.5])
+        assert request.columns["host"] is None
+    
+    @pytest.mark.asyncio
+    async def test_columns_match_dataframe_analysis(self, sparse_metrics_df):
+        """Les colonnes validées donnent la même analyse que le DataFrame des enregistrements"""
+        variables = list(sparse_metrics_df.columns)
+        records = [
+            {key: (None if pd.isna(value) else value) for key, value in row.items()}
+            for row in sparse_metrics_df.to_dict(orient="records")
+        ]
+        request = CorrelationAnalysisRequest(data=records, variables=variables)
+        
+        from_columns = await CorrelationAnalysisService().analyze_correlations(
+            data=request.columns, variables=variables
+        )
+        from_frame = await CorrelationAnalysisService().analyze_correlations(
+            data=sparse_metrics_df, variables=variables
+        )
+        
+        assert len(from_columns["significant_correlations"]) == len(from_frame["significant_correlations"])
+        for actual, expected in zip(from_columns["significant_correlations"], from_frame["significant_correlations"]):
+            assert actual == {**expected, "correlation": pytest.approx(expected["correlation"], abs=1e-12),
+                              "p_value": pytest.approx(expected["p_value"], rel=1e-9)}
+        for var in variables:
+            for other in variables:
+                assert from_columns["correlation_matrix"][var][other] == pytest.approx(
+                    from_frame["correlation_matrix"][var][other], abs=1e-12, nan_ok=True
+                )
+
+class TestTrendAnalysis:
+    """Agrégation des tendances par un seul resample"""
+    
+    GROUPERS = {
+        "daily": lambda ts: ts.dt.date,
+        "weekly": lambda ts: ts.dt.to_period("W"),
+        "monthly": lambda ts: ts.dt.to_period("M"),
+    }
+    
+    @pytest.fixture(scope="class")
+    def timeseries_records(self):
+        """Relevés irréguliers sur quatre mois, avec des jours vides et des valeurs manquantes"""
+        rng = np.random.default_rng(11)
+        timestamps = pd.Timestamp("2024-01-01") + pd.to_timedelta(np.sort(rng.choice(120 * 24, 300)), unit="h")
+        latency = np.linspace(100.0, 160.0, 300) + rng.normal(scale=5.0, size=300)
+        errors = rng.poisson(3, size=300).astype(np.int64)
+        records = [
+            {"timestamp": ts.isoformat(), "latency": float(lat), "errors": int(err)}
+            for ts, lat, err in zip(timestamps, latency, errors)
+        ]
+        for record in records[::7]:
+            record["latency"] = None
+        return records
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("trend_period", ["daily", "weekly", "monthly"])
+    async def test_matches_groupby_reference(self, timeseries_records, trend_period):
+        """Mêmes pentes, corrélations et nombres de périodes qu'un groupby par métrique suivi de linregress"""
+        result = await RCAAnalysisService().analyze_trends(
+            data=timeseries_records, time_field="timestamp",
+            metrics=["latency", "errors"], trend_period=trend_period
+        )
+        
+        df = pd.DataFrame(timeseries_records)
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        trends = {trend["metric"]: trend for trend in result["trends"]}
+        assert set(trends) == {"latency", "errors"}
+        
+        for metric, trend in trends.items():
+            periods = df.groupby(self.GROUPERS[trend_period](df["timestamp"]))[metric].agg(["mean", "count"])
+            periods = periods[periods["count"] > 0]
+            expected = stats.linregress(np.arange(len(periods)), periods["mean"].to_numpy())
+            
+            assert trend["data_points"] == len(periods)
+            assert trend["trend_slope"] == pytest.approx(expected.slope, rel=1e-9)
+            assert trend["correlation"] == pytest.approx(expected.rvalue, rel=1e-9)
+            assert trend["significance"] == pytest.approx(expected.pvalue, rel=1e-6, abs=1e-300)
+
+class TestPreparedMatrixCache:
+    """Cache des matrices préparées, indexé par une empreinte calculée côté serveur"""
+    
+    @pytest.mark.asyncio
+    async def test_same_shape_different_values_not_reused(self):
+        """Deux jeux de mêmes colonnes et même taille mais de valeurs différentes ne partagent pas le cache"""
+        service = CorrelationAnalysisService()
+        variables = ["cpu", "memory"]
+        correlated = records_to_columns([{"cpu": float(i), "memory": 2.0 * i} for i in range(10)], variables)
+        anticorrelated = records_to_columns([{"cpu": float(i), "memory": -2.0 * i} for i in range(10)], variables)
+        
+        first = await service.analyze_correlations(data=correlated, variables=variables)
+        second = await service.analyze_correlations(data=anticorrelated, variables=variables)
+        
+        assert first["correlation_matrix"]["cpu"]["memory"] == pytest.approx(1.0)
+        assert second["correlation_matrix"]["cpu"]["memory"] == pytest.approx(-1.0)
+    
+    def test_identical_columns_reuse_prepared_matrix(self):
+        """Des colonnes identiques (copies comprises) réutilisent la même matrice préparée"""
+        service = CorrelationAnalysisService()
+        variables = ["cpu", "memory"]
+        df = pd.DataFrame({"cpu": [1.0, 2.0, 3.0], "memory": [2.0, 1.0, np.nan]})
+        
+        prepared = service._get_prepared_matrix(df, variables)
+        
+        assert service._get_prepared_matrix(df.copy(), variables) is prepared
+        assert service._get_prepared_matrix(df.assign(memory=[2.0, 1.0, 0.0]), variables) is not prepared
+
+class TestArrowInput:
+    """Entrées colonnaires: construction Arrow des DataFrames et endpoint /correlation-binary"""
+    
+    ARROW_STREAM = "application/vnd.apache.arrow.stream"
+    
+    @pytest.fixture
+    def client(self):
+        """Client de test de l'application RCA"""
+        return TestClient(app)
+    
+    @pytest.mark.parametrize("records", [
+        [{"cpu": 1, "memory": 0.5, "host": "a"}, {"cpu": 2, "memory": 1.5, "host": "b"}],
+        [{"cpu": 1, "memory": None}, {"cpu": None, "memory": 2.5}],
+        [{"cpu": 1.5, "flag": True}, {"cpu": 2.0, "flag": False}],
+        [{"cpu": 1}, {"memory": 2.0}],
+        [{"value": 1}, {"value": "mixed"}],
+    ])
+    def test_to_dataframe_matches_pandas(self, records):
+        """Mêmes colonnes, dtypes et valeurs que pd.DataFrame(records)"""
+        pd.testing.assert_frame_equal(_to_dataframe(records), pd.DataFrame(records))
+    
+    def test_binary_endpoint(self, client):
+        """Un flux Arrow IPC valide est analysé comme les enregistrements équivalents"""
+        pa = pytest.importorskip("pyarrow")
+        table = pa.table({"cpu": [1.0, 2.0, 3.0, 4.0], "memory": [2.0, 4.1, 5.9, 8.0]})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        
+        response = client.post(
+            "/correlation-binary",
+            params={"variables": ["cpu", "memory"]},
+            content=sink.getvalue().to_pybytes(),
+            headers={"Content-Type": self.ARROW_STREAM}
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["correlation_matrix"]["cpu"]["memory"] == pytest.approx(
+            np.corrcoef([1.0, 2.0, 3.0, 4.0], [2.0, 4.1, 5.9, 8.0])[0, 1]
+        )
+    
+    def test_binary_endpoint_invalid_stream(self, client):
+        """Un corps qui n'est pas un flux Arrow IPC donne une erreur 400"""
+        pytest.importorskip("pyarrow")
+        
+        response = client.post(
+            "/correlation-binary",
+            params={"variables": ["cpu", "memory"]},
+            content=b"not an arrow stream",
+            headers={"Content-Type": self.ARROW_STREAM}
+        )
+        
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith("Flux Arrow invalide")
+    
+    def test_binary_endpoint_without_pyarrow(self, client, monkeypatch):
+        """Sans pyarrow, le format Arrow n'est pas supporté (415)"""
+        monkeypatch.setattr(analysis, "ARROW_AVAILABLE", False)
+        
+        response = client.post(
+            "/correlation-binary",
+            params={"variables": ["cpu", "memory"]},
+            content=b"",
+            headers={"Content-Type": self.ARROW_STREAM}
+        )
+        
+        assert response.status_code == 415
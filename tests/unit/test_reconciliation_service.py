@@ -0,0 +1,486 @@
+"""
+Tests unitaires pour le service de réconciliation
+"""
+
+import json
+
+import pytest
+import pandas as pd
+import numpy as np
+
+# Import des modules à tester
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../reconciliation-service/app'))
+# Chaque service a son propre module config
+sys.modules.pop("config", None)
+
+import zingg_client as zingg_client_module
+from zingg_client import ZinggClient, _soundex
+
+@pytest.fixture
+def zingg_client():
+    """Instance du client Zingg"""
+    return ZinggClient()
+
+def _match(i, j, score=0.95):
+    """Match entre les positions i et j"""
+    return {
+        "entity_1_index": i,
+        "entity_2_index": j,
+        "entity_1_id": str(i),
+        "entity_2_id": str(j),
+        "similarity_score": score,
+        "matching_fields": ["name"]
+    }
+
+class TestMergeMatchedEntities:
+    """Tests de fusion des entités matchées"""
+    
+    @pytest.mark.parametrize("merge_strategy", ["latest_wins", "first_wins", "concatenate", "unknown"])
+    def test_merge_component_with_empty_column(self, zingg_client, merge_strategy):
+        """Une composante de 3 enregistrements dont l'email est vide partout reste sérialisable"""
+        records = [
+            {"id": "1", "name": "John Doe", "email": ""},
+            {"id": "2", "name": "Jon Doe", "email": ""},
+            {"id": "3", "name": "John Do", "email": ""},
+            {"id": "4", "name": "Jane Smith", "email": "jane@example.com"}
+        ]
+        df = pd.DataFrame(records)
+        
+        # 0-1 et 1-2: une seule composante connexe de 3 enregistrements
+        merged = zingg_client._merge_matched_entities(df, [_match(0, 1), _match(1, 2)], merge_strategy)
+        
+        assert len(merged) == 2
+        group, single = merged
+        assert group["email"] == ""
+        assert single["email"] == "jane@example.com"
+        if merge_strategy != "unknown":
+            assert group["_merged_from"] == ["1", "2", "3"]
+        
+        # JSONResponse refuse les NaN
+        json.dumps(merged, allow_nan=False)
+    
+    def test_merge_component_with_missing_values(self, zingg_client):
+        """Une colonne absente (None) de tout le groupe donne None, pas NaN"""
+        df = pd.DataFrame([
+            {"id": "1", "name": "John Doe", "phone": None},
+            {"id": "2", "name": "Jon Doe", "phone": None},
+            {"id": "3", "name": "John Do", "phone": None}
+        ])
+        
+        merged = zingg_client._merge_matched_entities(df, [_match(0, 1), _match(1, 2)], "latest_wins")
+        
+        assert len(merged) == 1
+        assert merged[0]["phone"] is None
+        assert merged[0]["name"] == "John Do"
+        json.dumps(merged, allow_nan=False)
+
+class TestBatchReconciliation:
+    """Tests de réconciliation par lot"""
+    
+    @pytest.mark.asyncio
+    async def test_batch_does_not_change_single_reconciliation(self, zingg_client):
+        """Le vectoriseur ajusté pour un lot ne modifie pas les réconciliations unitaires suivantes"""
+        config = {"matching_fields": ["name"], "matching_algorithm": "tfidf"}
+        batch = [{"data": [{"id": "1", "name": "acme corp"}, {"id": "2", "name": "globex inc"}],
+                  "matching_config": config, "deduplication": False}]
+        data = [{"id": "3", "name": "zyxwq qpvo"}, {"id": "4", "name": "zyxwq qpvo"}]
+        
+        expected = await ZinggClient().reconcile_entities(
+            data=data, matching_config=config, entity_type="customer", deduplication=False
+        )
+        await zingg_client.reconcile_entities_batch(batch)
+        result = await zingg_client.reconcile_entities(
+            data=data, matching_config=config, entity_type="customer", deduplication=False
+        )
+        
+        assert expected["matched_pairs"] == 1
+        assert result["matched_pairs"] == expected["matched_pairs"]
+        assert result["merged_records"] == expected["merged_records"]
+
+class TestMatchingAlgorithm:
+    """Choix de l'algorithme de similarité"""
+    
+    def test_default_is_fuzzy(self, zingg_client):
+        """Sans matching_algorithm, les scores sont les ratios rapidfuzz (TF-IDF reste opt-in)"""
+        from rapidfuzz import fuzz
+        
+        df = pd.DataFrame({"id": ["1", "2", "3"], "name": ["John Doe", "Jon Doe", "Jane Smith"]})
+        
+        matches = zingg_client._find_entity_matches(df, {"matching_fields": ["name"]}, 0.8)
+        
+        assert [(m["entity_1_index"], m["entity_2_index"]) for m in matches] == [(0, 1)]
+        assert matches[0]["similarity_score"] == pytest.approx(fuzz.ratio("john doe", "jon doe") / 100.0)
+
+class TestTfidfMatching:
+    """Tests du matching TF-IDF"""
+    
+    @pytest.mark.asyncio
+    async def test_unseen_vocabulary_after_first_call(self, zingg_client):
+        """Un second appel au vocabulaire inédit retrouve ses doublons exacts"""
+        config = {"matching_fields": ["name"], "matching_algorithm": "tfidf"}
+        await zingg_client.reconcile_entities(
+            data=[{"id": "1", "name": "acme corp"}, {"id": "2", "name": "globex inc"}],
+            matching_config=config, entity_type="customer", deduplication=False
+        )
+        
+        result = await zingg_client.reconcile_entities(
+            data=[{"id": "3", "name": "zyxwq qpvo"}, {"id": "4", "name": "zyxwq qpvo"}],
+            matching_config=config, entity_type="customer", deduplication=False
+        )
+        
+        assert result["matched_pairs"] == 1
+        assert result["merged_records"][0]["_merged_from"] == ["3", "4"]
+        assert result["confidence_scores"]["max_confidence"] == pytest.approx(1.0, abs=1e-6)
+    
+    @pytest.fixture
+    def names_df(self):
+        """Noms avec variantes orthographiques"""
+        return pd.DataFrame({"name": [
+            "John Doe", "Jane Smith", "Jon Doe", "Jane Smyth", "Bob Johnson", "John Doe", "Robert Johnson"
+        ]})
+    
+    def _brute_force_cosine(self, zingg_client, df):
+        """Matrice dense des cosinus TF-IDF de toutes les paires"""
+        M = zingg_client._tfidf_matrix(zingg_client._match_texts(df, ["name"]), ["name"])
+        return (M @ M.T).toarray()
+    
+    @pytest.mark.parametrize("threshold", [0.3, 0.6, 0.9])
+    def test_threshold_filtering_and_ordering(self, zingg_client, names_df, threshold):
+        """Toutes les paires i < j au-dessus du seuil, et elles seules, triées par (i, j)"""
+        first, second, scores = zingg_client._tfidf_similar_pairs(names_df, ["name"], threshold)
+        
+        S = self._brute_force_cosine(zingg_client, names_df)
+        expected = [(i, j) for i in range(len(names_df)) for j in range(i + 1, len(names_df))
+                    if S[i, j] >= threshold - 1e-6]
+        
+        assert list(zip(first.tolist(), second.tolist())) == expected
+        assert (first < second).all()
+        np.testing.assert_allclose(scores, np.minimum([S[i, j] for i, j in expected], 1.0), rtol=1e-5)
+    
+    def test_blocked_pairs_are_unblocked_pairs_within_candidates(self, zingg_client, names_df):
+        """Avec blocking, mêmes paires et scores que sans blocking, restreints aux candidates"""
+        config = {"blocking": [{"field": "name", "key": "prefix2"}]}
+        candidates = zingg_client._candidate_pairs(names_df, config)
+        
+        blocked = zingg_client._tfidf_similar_pairs(names_df, ["name"], 0.2, candidates)
+        unblocked = zingg_client._tfidf_similar_pairs(names_df, ["name"], 0.2)
+        
+        candidate_set = set(zip(candidates[0].tolist(), candidates[1].tolist()))
+        expected = [
+            (i, j, score) for i, j, score in zip(*(values.tolist() for values in unblocked))
+            if (i, j) in candidate_set
+        ]
+        assert [(i, j) for i, j, _ in expected] == list(zip(blocked[0].tolist(), blocked[1].tolist()))
+        np.testing.assert_allclose(blocked[2], [score for _, _, score in expected], rtol=1e-5)
+        # Le blocking écarte au moins une paire (Bob Johnson / Robert Johnson)
+        assert len(blocked[0]) < len(unblocked[0])
+    
+    def test_score_candidate_pairs_threshold(self, zingg_client, names_df):
+        """_score_candidate_pairs ne garde que les candidates au-dessus du seuil, dans leur ordre"""
+        M = zingg_client._tfidf_matrix(zingg_client._match_texts(names_df, ["name"]), ["name"])
+        S = self._brute_force_cosine(zingg_client, names_df)
+        first = np.array([0, 0, 1, 4], dtype=np.int64)
+        second = np.array([2, 5, 3, 6], dtype=np.int64)
+        
+        kept_first, kept_second, scores = zingg_client._score_candidate_pairs(M, (first, second), 0.7)
+        
+        keep = S[first, second] >= 0.7 - 1e-6
+        assert kept_first.tolist() == first[keep].tolist()
+        assert kept_second.tolist() == second[keep].tolist()
+        assert scores.max() <= 1.0
+        np.testing.assert_allclose(scores, np.minimum(S[first, second][keep], 1.0), rtol=1e-5)
+    
+    def test_identical_texts_reuse_cached_matrix(self, zingg_client):
+        """Des textes identiques réutilisent la matrice en cache"""
+        texts = pd.Series(["acme corp", "acme corporation"])
+        
+        assert zingg_client._tfidf_matrix(texts, ["name"]) is zingg_client._tfidf_matrix(texts.copy(), ["name"])
+        assert zingg_client._tfidf_matrix(texts, ["name"]) is not zingg_client._tfidf_matrix(texts[::-1], ["name"])
+    
+    def test_cache_bounded_by_setting(self, zingg_client, monkeypatch):
+        """Au-delà de vectorizer_cache_size charges distinctes, la plus ancienne est réajustée"""
+        monkeypatch.setattr(zingg_client_module.settings, "vectorizer_cache_size", 2)
+        payloads = [pd.Series([f"acme {i}", f"globex {i}"]) for i in range(3)]
+        
+        matrices = [zingg_client._tfidf_matrix(texts, ["name"]) for texts in payloads]
+        
+        assert len(zingg_client._tfidf_cache) == 2
+        assert zingg_client._tfidf_matrix(payloads[2], ["name"]) is matrices[2]
+        assert zingg_client._tfidf_matrix(payloads[0], ["name"]) is not matrices[0]
+
+class TestBlockingKeys:
+    """Clés de blocking phonétiques et MinHash"""
+    
+    @pytest.mark.parametrize("value,code", [
+        ("Robert", "R163"), ("Rupert", "R163"), ("Rubin", "R150"),
+        ("Ashcraft", "A261"), ("Ashcroft", "A261"), ("Tymczak", "T522"),
+        ("Pfister", "P236"), ("Honeyman", "H555"), ("Lee", "L000"),
+        ("  o'Brien ", "O165"), ("123", ""), ("", ""),
+    ])
+    def test_soundex_codes(self, value, code):
+        """Codes Soundex de référence (h/w, lettres répétées, chaînes sans lettre)"""
+        assert _soundex(value) == code
+    
+    def test_minhash_recall_on_near_duplicates(self, zingg_client):
+        """Les quasi-doublons d'adresses longues partagent une bande; les adresses sans rapport non"""
+        bases = [
+            "12 rue de la republique, batiment b, 69002 lyon",
+            "1600 pennsylvania avenue northwest, washington dc 20500",
+            "221b baker street, marylebone, london nw1 6xe",
+            "4 place du marechal de lattre de tassigny, 75016 paris",
+        ]
+        variants = [
+            "12 rue de la republique, bat b, 69002 lyon",
+            "1600 pennsylvania ave northwest, washington dc 20500",
+            "221b baker st, marylebone, london nw1 6xe",
+            "4 place du marechal de lattre de tassigny 75016 paris",
+        ]
+        df = pd.DataFrame({"address": bases + variants})
+        n = len(bases)
+        
+        first, second = zingg_client._candidate_pairs(df, {"blocking": [{"field": "address", "key": "minhash"}]})
+        
+        pairs = set(zip(first.tolist(), second.tolist()))
+        assert {(i, i + n) for i in range(n)} <= pairs
+        assert not pairs & {(i, j) for i in range(n) for j in range(i + 1, n)}
+
+class TestPolarsBlocking:
+    """Blocking par jointure Polars paresseuse des grands lots"""
+    
+    @pytest.mark.parametrize("blocking", [
+        [{"field": "email", "key": "domain"}, {"field": "name", "key": "prefix3"}],
+        [{"field": "name", "key": "soundex"}, {"field": "email", "key": "exact"}],
+        [{"field": "address", "key": "minhash"}, {"field": "name", "key": "prefix2"}, {"field": "missing"}],
+    ])
+    def test_matches_pandas_blocking(self, zingg_client, monkeypatch, blocking):
+        """Mêmes paires candidates, dans le même ordre, que le blocking pandas"""
+        pytest.importorskip("polars")
+        rng = np.random.default_rng(5)
+        names = ["John Doe", "Jon Doe", "Jane Smith", "Janet Smyth", "Bob Johnson", "Robert Jonson", "", None]
+        domains = ["x.com", "y.org", "z.net"]
+        streets = ["12 rue de la paix paris", "12 rue de la paix, paris", "3 avenue victor hugo lyon"]
+        df = pd.DataFrame({
+            "name": rng.choice(np.array(names, dtype=object), 200),
+            "email": [f"user{i % 40}@{domains[i % 3]}" if i % 17 else None for i in range(200)],
+            "address": rng.choice(np.array(streets, dtype=object), 200),
+        })
+        config = {"blocking": blocking}
+        
+        expected = zingg_client._candidate_pairs(df, config)
+        monkeypatch.setattr(zingg_client_module.settings, "polars_blocking_min_rows", 0)
+        first, second = zingg_client._candidate_pairs(df, config)
+        
+        assert len(expected[0]) > 0
+        np.testing.assert_array_equal(first, expected[0])
+        np.testing.assert_array_equal(second, expected[1])
+
+class TestJaccardMatching:
+    """Matching par indice de Jaccard des jetons"""
+    
+    @pytest.fixture
+    def addresses_df(self):
+        """Adresses partageant plus ou moins de jetons, dont une vide"""
+        return pd.DataFrame({"address": [
+            "12 rue de la Paix Paris", "12 rue de la paix", "rue de la Paix 12 Paris 75002",
+            "3 avenue Victor Hugo Lyon", "3 av Victor Hugo Lyon", "", "Paris"
+        ]})
+    
+    def _reference(self, df, threshold, pairs=None):
+        """Paires (i < j, score) calculées avec des ensembles Python"""
+        import re
+        
+        tokens = [set(re.findall(r"\b\w+\b", text.lower())) for text in df["address"]]
+        if pairs is None:
+            pairs = [(i, j) for i in range(len(df)) for j in range(i + 1, len(df))]
+        result = []
+        for i, j in pairs:
+            union = tokens[i] | tokens[j]
+            score = len(tokens[i] & tokens[j]) / len(union) if union else 0.0
+            if score >= threshold:
+                result.append((i, j, score))
+        return result
+    
+    @pytest.mark.parametrize("threshold", [0.2, 0.5, 0.8])
+    @pytest.mark.parametrize("block_size", [2, 1000])
+    def test_matches_set_reference(self, zingg_client, addresses_df, monkeypatch, threshold, block_size):
+        """Mêmes paires et scores que le calcul par ensembles, quel que soit le découpage en blocs"""
+        monkeypatch.setattr(zingg_client_module.settings, "batch_processing_size", block_size)
+        
+        first, second, scores = zingg_client._jaccard_similar_pairs(addresses_df, ["address"], threshold)
+        
+        expected = self._reference(addresses_df, threshold)
+        assert list(zip(first.tolist(), second.tolist())) == [(i, j) for i, j, _ in expected]
+        np.testing.assert_allclose(scores, [score for _, _, score in expected])
+    
+    def test_candidate_pairs_match_set_reference(self, zingg_client, addresses_df):
+        """Avec des paires candidates, seules celles-ci sont scorées"""
+        candidates = (np.array([0, 0, 1, 3, 4], dtype=np.int64), np.array([1, 3, 2, 4, 5], dtype=np.int64))
+        
+        first, second, scores = zingg_client._jaccard_similar_pairs(addresses_df, ["address"], 0.3, candidates)
+        
+        expected = self._reference(addresses_df, 0.3, list(zip(*(c.tolist() for c in candidates))))
+        assert list(zip(first.tolist(), second.tolist())) == [(i, j) for i, j, _ in expected]
+        np.testing.assert_allclose(scores, [score for _, _, score in expected])
+
+class TestAnnCandidates:
+    """Paires candidates par plus proches voisins (config["ann"])"""
+    
+    @pytest.fixture
+    def people_df(self):
+        """Noms en groupes de variantes proches"""
+        return pd.DataFrame({"name": [
+            "John Doe", "Jon Doe", "John Do", "Jane Smith", "Jane Smyth", "Janet Smith",
+            "Bob Johnson", "Robert Johnson", "Bob Jonson", "Alice Martin", "Alicia Martin", "Alice Marten"
+        ]})
+    
+    def _matrix(self, zingg_client, df):
+        """Matrice TF-IDF (lignes normalisées) des noms"""
+        return zingg_client._tfidf_matrix(zingg_client._match_texts(df, ["name"]), ["name"])
+    
+    @pytest.mark.parametrize("faiss_available", [
+        False,
+        pytest.param(True, marks=pytest.mark.skipif(
+            not zingg_client_module.FAISS_AVAILABLE, reason="faiss non installé"
+        )),
+    ])
+    def test_nearest_neighbor_is_candidate(self, zingg_client, people_df, monkeypatch, faiss_available):
+        """Paires i < j uniques et triées; le plus proche voisin exact de chaque ligne en fait partie"""
+        monkeypatch.setattr(zingg_client_module, "FAISS_AVAILABLE", faiss_available)
+        M = self._matrix(zingg_client, people_df)
+        
+        first, second = zingg_client._ann_candidates(M, 2)
+        
+        codes = first * len(people_df) + second
+        assert (first < second).all()
+        assert (np.diff(codes) > 0).all()
+        S = (M @ M.T).toarray()
+        np.fill_diagonal(S, -1.0)
+        pairs = set(zip(first.tolist(), second.tolist()))
+        for i, j in enumerate(S.argmax(axis=1)):
+            assert (min(i, j), max(i, j)) in pairs
+    
+    def test_sklearn_fallback_covers_all_pairs(self, zingg_client, people_df, monkeypatch):
+        """Sans FAISS, k >= n - 1 donne toutes les paires et les mêmes résultats que sans ANN"""
+        monkeypatch.setattr(zingg_client_module, "FAISS_AVAILABLE", False)
+        n = len(people_df)
+        
+        first, second = zingg_client._ann_candidates(self._matrix(zingg_client, people_df), n)
+        assert list(zip(first.tolist(), second.tolist())) == [(i, j) for i in range(n) for j in range(i + 1, n)]
+        
+        with_ann = zingg_client._tfidf_similar_pairs(people_df, ["name"], 0.4, config={"ann": {"k": n}})
+        exact = zingg_client._tfidf_similar_pairs(people_df, ["name"], 0.4)
+        for ann_values, exact_values in zip(with_ann, exact):
+            np.testing.assert_allclose(ann_values, exact_values, rtol=1e-6)
+    
+    def test_faiss_candidates_are_deterministic(self, zingg_client, people_df):
+        """SVD tronquée à graine fixe: mêmes candidates d'un appel à l'autre"""
+        pytest.importorskip("faiss")
+        M = self._matrix(zingg_client, people_df)
+        
+        first, second = zingg_client._ann_candidates(M, 3)
+        again_first, again_second = zingg_client._ann_candidates(M, 3)
+        
+        np.testing.assert_array_equal(first, again_first)
+        np.testing.assert_array_equal(second, again_second)
+
+class TestExactMatchFields:
+    """Identifiants exacts (exact_match_fields) et masque de déduplication"""
+    
+    @pytest.fixture
+    def contacts_df(self):
+        """Contacts dont les emails se répètent à la casse et aux espaces près"""
+        return pd.DataFrame({
+            "name": ["John Doe", "J. Doe", "Jane Smith", "Johnny Doe", "Jane Smyth", "Bob", "Jon Doe"],
+            "email": ["john@x.com", " JOHN@x.com", "jane@y.com", "john@x.com", "", None, "jon@x.com"]
+        })
+    
+    def test_exact_pairs_groups(self, zingg_client, contacts_df):
+        """Toutes les paires d'un groupe d'emails normalisés identiques; vides et None ignorés"""
+        n = len(contacts_df)
+        
+        codes, scored = zingg_client._exact_pairs(contacts_df, ["email"])
+        
+        assert list(zip((codes // n).tolist(), (codes % n).tolist())) == [(0, 1), (0, 3), (1, 3)]
+        # Seul le premier enregistrement du groupe reste soumis au calcul de similarité
+        assert scored.tolist() == [True, False, True, False, True, True, True]
+    
+    def test_similar_pairs_with_exact_fields(self, zingg_client, contacts_df):
+        """Paires exactes de score 1.0 plus paires similaires entre lignes restant à comparer"""
+        config = {"matching_algorithm": "fuzzy", "exact_match_fields": ["email"]}
+        
+        first, second, scores = zingg_client._similar_pairs(contacts_df, ["name"], 0.8, config)
+        
+        scored = [0, 2, 4, 5, 6]
+        sub_first, sub_second, sub_scores = zingg_client._similar_pairs(
+            contacts_df.iloc[scored], ["name"], 0.8, {"matching_algorithm": "fuzzy"}
+        )
+        expected = {(0, 1): 1.0, (0, 3): 1.0, (1, 3): 1.0}
+        for i, j, score in zip(sub_first.tolist(), sub_second.tolist(), sub_scores.tolist()):
+            expected.setdefault((scored[i], scored[j]), score)
+        
+        assert list(zip(first.tolist(), second.tolist())) == sorted(expected)
+        np.testing.assert_allclose(scores, [expected[pair] for pair in sorted(expected)])
+        assert (0, 6) in expected and (2, 4) in expected
+    
+    @pytest.mark.parametrize("seed", range(5))
+    def test_greedy_keep_mask_matches_loop(self, zingg_client, seed):
+        """Même masque que la boucle par paires: une ligne conservée élimine ses doublons suivants"""
+        rng = np.random.default_rng(seed)
+        n = 30
+        codes = np.unique(rng.choice(n * n, 60))
+        first, second = codes // n, codes % n
+        keep_pair = first < second
+        first, second = first[keep_pair], second[keep_pair]
+        
+        alive = [True] * n
+        for i, j in zip(first.tolist(), second.tolist()):
+            if alive[i]:
+                alive[j] = False
+        
+        assert zingg_client._greedy_keep_mask(n, first, second).tolist() == alive
+
+class TestDeduplication:
+    """Tests de déduplication"""
+    
+    def test_fuzzy_deduplication_matches_pairwise_reference(self, zingg_client):
+        """La déduplication fuzzy vectorisée conserve les mêmes lignes que la boucle par paires"""
+        from rapidfuzz import fuzz
+        
+        df = pd.DataFrame({
+            "name": ["John Doe", "Jon Doe", "Jane Smith", "Jane Smyth", "Bob Johnson", "John Doe Jr", None],
+            "email": ["john@x.com", "john@x.com", "", "jane@y.com", "bob@z.com", "john@x.com", "none@x.com"]
+        })
+        config = {"similarity_fields": ["name", "email"], "similarity_threshold": 0.85, "matching_algorithm": "fuzzy"}
+        
+        # Référence: chaque ligne conservée élimine ses doublons suivants
+        values = [df[field].map(str).str.strip().str.lower().tolist() for field in ["name", "email"]]
+        alive = [True] * len(df)
+        for i in range(len(df)):
+            if not alive[i]:
+                continue
+            for j in range(i + 1, len(df)):
+                ratios = [fuzz.ratio(column[i], column[j]) / 100.0 for column in values if column[i] and column[j]]
+                if ratios and sum(ratios) / len(ratios) >= 0.85:
+                    alive[j] = False
+        
+        result = zingg_client._deduplicate_dataframe(df, config)
+        
+        assert result.index.tolist() == [i for i in range(len(df)) if alive[i]]
+        assert len(result) < len(df)
+    
+    @pytest.mark.asyncio
+    async def test_deduplicate_data(self, zingg_client):
+        """Déduplication de l'endpoint /deduplicate: doublons exacts puis similaires"""
+        data = [
+            {"id": "1", "name": "John Doe"},
+            {"id": "1", "name": "John Doe"},
+            {"id": "2", "name": "Jon Doe"},
+            {"id": "3", "name": "Jane Smith"}
+        ]
+        config = {"similarity_fields": ["name"], "similarity_threshold": 0.85, "matching_algorithm": "fuzzy"}
+        
+        result = await zingg_client.deduplicate_data(data=data, config=config)
+        
+        assert [record["id"] for record in result] == ["1", "3"]